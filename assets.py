@@ -0,0 +1,109 @@
+import pygame
+import os
+import json
+import mmap
+import hashlib
+
+ASSETS_DIR = 'Assets'
+ATLAS_FILE = 'atlas.rgba'
+ATLAS_TABLE = 'atlas.json'
+ATLAS_FORMAT = 'RGBA'
+
+_images = {}
+_atlas = None
+
+
+def _convert(image):
+    '''
+    Function converting the surface to the pixel format of the display.
+    Conversion is possible only after the display mode has been set.
+    '''
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return image.convert_alpha()
+    return image
+
+
+def sourceHash(name, directory=ASSETS_DIR):
+    '''
+    Function returning hash of the image file,
+    used to check if the baked atlas is up to date.
+    '''
+    with open(os.path.join(directory, name), 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def spriteKey(sprite):
+    '''
+    Function returning cache key of the sprite from the atlas table.
+    '''
+    size = sprite['size']
+    return (sprite['name'], None if size is None else tuple(size),
+            sprite['rotation'])
+
+
+def loadAtlas(directory=ASSETS_DIR):
+    '''
+    Function loading sprites baked by bake.py into the cache.
+    Raw pixels of the atlas are memory-mapped and used directly
+    as a surface, so no PNG is decoded or scaled.
+    Returns False if there is no atlas or it is older than the images.
+    '''
+    global _atlas
+    try:
+        with open(os.path.join(directory, ATLAS_TABLE), 'r') as file:
+            table = json.load(file)
+        for name, digest in table['sources'].items():
+            if sourceHash(name, directory) != digest:
+                return False
+        with open(os.path.join(directory, ATLAS_FILE), 'rb') as file:
+            pixels = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, KeyError):
+        return False
+    width, height = table['size']
+    if len(pixels) != width * height * len(ATLAS_FORMAT):
+        return False
+    atlas = pygame.image.frombuffer(pixels, (width, height), ATLAS_FORMAT)
+    _atlas = (pixels, atlas)
+    for sprite in table['sprites']:
+        _images[spriteKey(sprite)] = _convert(
+            atlas.subsurface(sprite['rect']))
+    return True
+
+
+def loadImage(name, size=None, rotation=0):
+    '''
+    Function returning image from the Assets directory.
+    Sprites of the baked atlas are loaded at the first call.
+    Other files are read from the disk only once, every derived variant
+    (scaled and rotated) is memoized by (name, size, rotation).
+    Returned surfaces are shared, so they must not be modified.
+    '''
+    global _atlas
+    key = (name, size, rotation)
+    image = _images.get(key)
+    if image is not None:
+        return image
+    if _atlas is None:
+        if loadAtlas():
+            return loadImage(name, size, rotation)
+        _atlas = False
+    if size is None and rotation == 0:
+        image = pygame.image.load(os.path.join(ASSETS_DIR, name))
+    elif rotation == 0:
+        image = pygame.transform.scale(loadImage(name), size)
+    else:
+        image = pygame.transform.rotate(loadImage(name, size), rotation)
+    image = _convert(image)
+    _images[key] = image
+    return image
+
+
+def clearCache(atlas=True):
+    '''
+    Function removing every loaded image from the cache.
+    The atlas is loaded again when an image is needed,
+    unless atlas is False, then images are loaded only from their files.
+    '''
+    global _atlas
+    _images.clear()
+    _atlas = None if atlas else False
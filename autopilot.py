@@ -0,0 +1,113 @@
+LOST = -1000000
+SCORE_VALUE = 1000
+
+
+class Plan:
+    '''
+    Class describing how the autopilot plays one of the games.
+    Actions are tried in the given order, so the first one wins ties.
+    Pressed actions last one tick, the others are held
+    for the whole move of repeat ticks. value rates a state
+    of the engine which is not lost.
+    '''
+    def __init__(self, actions, pressed, value, repeat, depth):
+        '''
+        Function initializing the plan.
+        '''
+        self.actions = actions
+        self.pressed = pressed
+        self.value = value
+        self.repeat = repeat
+        self.depth = depth
+
+    def move(self, action):
+        '''
+        Function returning actions of the ticks of one move.
+        '''
+        if action in self.pressed:
+            return [action] + [0] * (self.repeat - 1)
+        return [action] * self.repeat
+
+
+class Autopilot:
+    '''
+    Class playing a game by simulating it ahead.
+    Every move of the plan is tried in a private engine restored
+    from snapshots, the first move of the best sequence is played
+    and then the search is repeated. The search never touches
+    the played game, so its random numbers stay the same.
+    The autopilot is off until it is toggled, games in which it was
+    ever switched on are marked as used.
+    '''
+    def __init__(self, engine_class, plan, window=None, enabled=False):
+        '''
+        Function initializing the autopilot of the game.
+        The engine is created when the autopilot plays for the first time.
+        '''
+        self.engine_class = engine_class
+        self.plan = plan
+        self.window = window
+        self.engine = None
+        self.moves = [self.plan.move(action) for action in self.plan.actions]
+        self.queue = []
+        self.enabled = enabled
+        self.used = enabled
+
+    def toggle(self):
+        '''
+        Function switching the autopilot on or off.
+        '''
+        self.enabled = not self.enabled
+        self.used = True
+        self.queue = []
+
+    def rate(self, depth):
+        '''
+        Function returning value of the best sequence of moves
+        from the current state of the engine.
+        Lost games are worse the earlier they are lost.
+        '''
+        engine = self.engine
+        if engine.gameover:
+            return LOST + engine.ticks
+        if depth == 0:
+            return engine.score * SCORE_VALUE + self.plan.value(engine)
+        snapshot = engine.getSnapshot()
+        best = None
+        for i, move in enumerate(self.moves):
+            if i > 0:
+                engine.setSnapshot(snapshot)
+            for action in move:
+                engine.step(action)
+            value = self.rate(depth - 1)
+            if best is None or value > best:
+                best = value
+        return best
+
+    def search(self, game):
+        '''
+        Function returning index of the best move in the state of the game.
+        '''
+        if self.engine is None:
+            self.engine = self.engine_class(self.window, game.seed)
+        snapshot = game.getSnapshot()
+        best = None
+        best_move = 0
+        for i, move in enumerate(self.moves):
+            self.engine.setSnapshot(snapshot)
+            for action in move:
+                self.engine.step(action)
+            value = self.rate(self.plan.depth - 1)
+            if best is None or value > best:
+                best = value
+                best_move = i
+        return best_move
+
+    def nextAction(self, game):
+        '''
+        Function returning action for the current tick of the game.
+        A new move is searched only after the previous one is played.
+        '''
+        if not self.queue:
+            self.queue = list(reversed(self.moves[self.search(game)]))
+        return self.queue.pop()
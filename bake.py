@@ -0,0 +1,96 @@
+import os
+import json
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+import assets
+import menumanager
+import flappybird
+import skybird
+import spikes
+
+ATLAS_WIDTH = 1024
+SPRITE_PADDING = 1
+
+SPRITES = [
+    ('birdgames.png', None, 0),
+    ('skybird.png', (menumanager.BIRD_SIZE, menumanager.BIRD_SIZE), 0),
+    ('skybird.png', (flappybird.BIRD_SIZE, flappybird.BIRD_SIZE), 0),
+    ('skybird.png', (skybird.BIRD_SIZE, skybird.BIRD_SIZE), 0),
+    ('skybird.png', (spikes.BIRD_SIZE, spikes.BIRD_SIZE), 0),
+    ('obstacle.png', (flappybird.OBSTACLE_WIDTH,
+                      flappybird.OBSTACLE_HEIGHT), 0),
+    ('obstacle.png', (flappybird.OBSTACLE_WIDTH,
+                      flappybird.OBSTACLE_HEIGHT), 180),
+    ('object.png', (skybird.OBJECT_WIDTH, skybird.OBJECT_HEIGHT), 0),
+]
+
+
+def packSprites(sizes, width=ATLAS_WIDTH, padding=SPRITE_PADDING):
+    '''
+    Function placing rectangles of the given sizes in rows,
+    the highest ones first. Returns their rects and size of the atlas.
+    '''
+    width = max([width] + [w + padding for w, h in sizes])
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    rects = [None] * len(sizes)
+    x = y = row_height = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width:
+            x = 0
+            y += row_height
+            row_height = 0
+        rects[i] = [x, y, w, h]
+        x += w + padding
+        row_height = max(row_height, h + padding)
+    return rects, (width, y + row_height)
+
+
+def bake():
+    '''
+    Function drawing every sprite at its size and rotation used
+    in the games into one atlas of raw pixels, with a table of rects.
+    Sprites are read from the Assets directory and the atlas
+    is written next to them.
+    '''
+    directory = assets.ASSETS_DIR
+    assets.clearCache(atlas=False)
+    sprites = list(dict.fromkeys(SPRITES))
+    images = [assets.loadImage(*sprite) for sprite in sprites]
+    rects, (width, height) = packSprites([image.get_size()
+                                          for image in images])
+    stride = width * len(assets.ATLAS_FORMAT)
+    pixels = bytearray(stride * height)
+    for image, (x, y, w, h) in zip(images, rects):
+        data = pygame.image.tobytes(image, assets.ATLAS_FORMAT)
+        row = w * len(assets.ATLAS_FORMAT)
+        for i in range(h):
+            start = (y + i) * stride + x * len(assets.ATLAS_FORMAT)
+            pixels[start:start + row] = data[i * row:(i + 1) * row]
+    table = {
+        'size': [width, height],
+        'sources': {name: assets.sourceHash(name, directory)
+                    for name in sorted(set(name for name, s, r in sprites))},
+        'sprites': [{'name': name, 'size': size, 'rotation': rotation,
+                     'rect': rect}
+                    for (name, size, rotation), rect in zip(sprites, rects)],
+    }
+    with open(os.path.join(directory, assets.ATLAS_FILE), 'wb') as file:
+        file.write(pixels)
+    with open(os.path.join(directory, assets.ATLAS_TABLE), 'w') as file:
+        json.dump(table, file, indent=1)
+    assets.clearCache()
+    return table
+
+
+def main():
+    table = bake()
+    width, height = table['size']
+    print("baked %d sprites into %dx%d atlas"
+          % (len(table['sprites']), width, height))
+
+
+if __name__ == "__main__":
+    main()
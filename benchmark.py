@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import multiprocessing
+import platform
+import tracemalloc
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+import assets
+import fonts
+import scores
+from engines import ENGINES
+from rollout import POLICIES
+from renderer import Renderer
+from controls import InputSnapshot
+from menumanager import GameManager
+from flappybird import FlappyBird
+from skybird import SkyBird
+from spikes import SpikesBird
+
+SIZE = (800, 600)
+BENCHMARKS = ('flappy', 'skybird', 'spikes', 'menu')
+FRONTENDS = {'flappy': FlappyBird, 'skybird': SkyBird, 'spikes': SpikesBird}
+
+SIM_TICKS = 20000
+RENDER_FRAMES = 2000
+MEMORY_FRAMES = 300
+TICKS_PER_FRAME = 2
+REPEATS = 3
+THRESHOLD = 0.2
+RESULTS_FILE = 'benchmark.json'
+BASELINE_FILE = 'benchmark_baseline.json'
+
+MENU_POINTS = [(0, 0), (100, 350), (120, 360), (350, 330), (600, 320),
+               (0, 0), (610, 330)]
+MENU_POINT_FRAMES = 30
+
+HIGHER = 1
+LOWER = -1
+METRICS = {'sim_ticks_per_s': HIGHER, 'render_fps': HIGHER,
+           'peak_memory_kb': LOWER}
+
+
+class ScriptedMouse:
+    '''
+    Class giving input of a cursor moving along MENU_POINTS,
+    which never clicks.
+    '''
+    def __init__(self):
+        '''
+        Function initializing the mouse.
+        '''
+        self.frame = 0
+
+    def next(self):
+        '''
+        Function moving the cursor one frame forward.
+        '''
+        self.frame += 1
+
+    def snapshot(self):
+        '''
+        Function returning input with the current position of the cursor.
+        '''
+        return InputSnapshot(mouse_pos=MENU_POINTS[
+            (self.frame // MENU_POINT_FRAMES) % len(MENU_POINTS)])
+
+
+class ScriptedPlayer:
+    '''
+    Class playing a game with the heuristic policy of rollout.py,
+    a new seeded game is started after every game over.
+    '''
+    def __init__(self, name, create, seed):
+        '''
+        Function initializing the player,
+        create makes a new game from a seed.
+        '''
+        self.policy = POLICIES[name]['heuristic']
+        self.create = create
+        self.seed = seed
+        self.rng = random.Random(seed + 1)
+        self.game = create(seed)
+
+    def tick(self):
+        '''
+        Function simulating one tick of the game.
+        '''
+        if self.game.gameover:
+            self.seed += 1
+            self.game = self.create(self.seed)
+        self.game.step(self.policy(self.game.getState(), self.rng))
+
+
+class Benchmark:
+    '''
+    Class measuring one of the games or the menu.
+    '''
+    def __init__(self, name, renderer, mouse, seed=0):
+        '''
+        Function initializing the benchmark.
+        '''
+        self.name = name
+        self.renderer = renderer
+        self.mouse = mouse
+        self.seed = seed
+
+    def createSimulation(self):
+        '''
+        Function returning function simulating one tick.
+        '''
+        if self.name == 'menu':
+            manager = GameManager(self.renderer)
+            return lambda: manager.actions(self.mouse.snapshot())
+        player = ScriptedPlayer(self.name,
+                                lambda seed: ENGINES[self.name](seed=seed),
+                                self.seed)
+        return player.tick
+
+    def createFrontend(self):
+        '''
+        Function returning (tick, draw) functions of the drawn game.
+        '''
+        if self.name == 'menu':
+            manager = GameManager(self.renderer)
+            return (lambda: manager.actions(self.mouse.snapshot()),
+                    manager.drawWindow)
+        frontend = FRONTENDS[self.name]
+        player = ScriptedPlayer(self.name,
+                                lambda seed: frontend(self.renderer, seed),
+                                self.seed)
+        return player.tick, lambda alpha: player.game.drawWindow(alpha)
+
+    def simulate(self, ticks):
+        '''
+        Function returning number of simulated ticks per second.
+        '''
+        tick = self.createSimulation()
+        start = time.perf_counter()
+        for i in range(ticks):
+            self.mouse.next()
+            tick()
+        return ticks / (time.perf_counter() - start)
+
+    def render(self, frames):
+        '''
+        Function returning number of drawn frames per second.
+        Only drawing and presenting is measured, ticks between
+        frames are simulated outside of the measured time.
+        '''
+        tick, draw = self.createFrontend()
+        self.renderer.invalidate()
+        drawing = 0.0
+        for i in range(frames):
+            self.mouse.next()
+            for j in range(TICKS_PER_FRAME):
+                tick()
+            start = time.perf_counter()
+            draw(0.5)
+            self.renderer.present()
+            drawing += time.perf_counter() - start
+        return frames / drawing
+
+    def measureMemory(self, frames):
+        '''
+        Function returning peak memory in kilobytes allocated while
+        loading, simulating and drawing the given number of frames.
+        '''
+        assets.clearCache()
+        fonts.clearCache()
+        tracemalloc.start()
+        try:
+            self.simulate(frames * TICKS_PER_FRAME)
+            self.render(frames)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return peak / 1024
+
+    def run(self, ticks, frames, memory_frames, repeats=REPEATS):
+        '''
+        Function returning every metric of the benchmark.
+        Speed is the best of repeated runs, which is the least
+        disturbed by other processes.
+        '''
+        memory = self.measureMemory(memory_frames)
+        simulation = max(self.simulate(ticks) for i in range(repeats))
+        rendering = max(self.render(frames) for i in range(repeats))
+        return {'sim_ticks_per_s': round(simulation, 1),
+                'render_fps': round(rendering, 1),
+                'peak_memory_kb': round(memory, 1)}
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    '''
+    Function returning descriptions of metrics which are worse
+    than in the baseline by more than the threshold.
+    '''
+    regressions = []
+    for name, metrics in results.items():
+        for metric, direction in METRICS.items():
+            old = baseline.get(name, {}).get(metric)
+            new = metrics.get(metric)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old) / old * direction
+            if change < -threshold:
+                regressions.append('%s %s: %s -> %s (%+.1f%%)'
+                                   % (name, metric, old, new,
+                                      (new - old) / old * 100))
+    return regressions
+
+
+def runBenchmark(task):
+    '''
+    Function running one benchmark with the dummy video driver.
+    Finished games are saved in a temporary score store,
+    so the database of the player is never touched.
+    '''
+    name, ticks, frames, memory_frames, repeats, seed = task
+    pygame.init()
+    screen = pygame.display.set_mode(SIZE)
+    with tempfile.TemporaryDirectory() as directory:
+        scores.openStore(path=os.path.join(directory, scores.DATABASE))
+        try:
+            benchmark = Benchmark(name, Renderer(screen), ScriptedMouse(),
+                                  seed)
+            return benchmark.run(ticks, frames, memory_frames, repeats)
+        finally:
+            scores.closeStore()
+            pygame.quit()
+
+
+def runBenchmarks(names=BENCHMARKS, ticks=SIM_TICKS, frames=RENDER_FRAMES,
+                  memory_frames=MEMORY_FRAMES, repeats=REPEATS, seed=0):
+    '''
+    Function running benchmarks one after another and returning
+    their results by name. Every benchmark runs in a new process,
+    so its results do not depend on the benchmarks run before.
+    '''
+    tasks = [(name, ticks, frames, memory_frames, repeats, seed)
+             for name in names]
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        return dict(zip(names, pool.map(runBenchmark, tasks, 1)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure speed of simulation and drawing.")
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help="benchmarks to run: " + ', '.join(BENCHMARKS) +
+                             " (all by default)")
+    parser.add_argument('--ticks', type=int, default=SIM_TICKS)
+    parser.add_argument('--frames', type=int, default=RENDER_FRAMES)
+    parser.add_argument('--memory-frames', type=int, default=MEMORY_FRAMES)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="allowed relative regression")
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark: " + name)
+
+    results = runBenchmarks(args.names or BENCHMARKS, args.ticks,
+                            args.frames, args.memory_frames, args.repeats,
+                            args.seed)
+    report = {'python': platform.python_version(),
+              'pygame': pygame.version.ver,
+              'machine': platform.machine(),
+              'results': results}
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    for name, metrics in results.items():
+        print('%-8s %10.1f ticks/s %8.1f fps %10.1f kB'
+              % (name, metrics['sim_ticks_per_s'], metrics['render_fps'],
+                 metrics['peak_memory_kb']))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+        return
+    if not os.path.exists(args.baseline):
+        print("no baseline in " + args.baseline +
+              ", run with --save-baseline first", file=sys.stderr)
+        sys.exit(1)
+    with open(args.baseline) as file:
+        baseline = json.load(file)['results']
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print("regression: " + regression, file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
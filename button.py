@@ -1,4 +1,5 @@
 import pygame
+import fonts
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -16,35 +17,32 @@ class Button:
         self.backgroundrect = pygame.rect.Rect(x+5, y+5, width, height)
         self.text = text
 
-    def checkMouseCollision(self):
+    def checkMouseCollision(self, mouse_pos):
         '''
         Function checking if the mouse position collide with the button.
         '''
-        return self.rect.collidepoint(pygame.mouse.get_pos())
+        return self.rect.collidepoint(mouse_pos)
 
-    def click(self):
+    def click(self, inputs):
         '''
         Function checking if the button is clicked by the mouse.
         '''
-        if pygame.mouse.get_pressed()[0] and self.checkMouseCollision():
-            return True
-        return False
+        return inputs.clicked(self.rect)
 
     def drawText(self, screen, size):
         '''
         Function drawing text inside the button.
         '''
-        self.font = pygame.font.SysFont('comicsans', size)
-        self.pytext = self.font.render(self.text, 1, BLACK)
+        self.pytext = fonts.renderText(self.text, size, BLACK)
         self.text_box = self.pytext.get_rect()
         self.text_box.center = self.rect.center
         screen.blit(self.pytext, (self.text_box.x, self.text_box.y))
 
-    def draw(self, screen):
+    def draw(self, screen, hovered):
         '''
         Function drawing button.
         '''
-        if self.checkMouseCollision():
+        if hovered:
             pygame.draw.rect(screen, BLACK, self.backgroundrect,
                              border_radius=40)
             pygame.draw.rect(screen, WHITE, self.rect, border_radius=40)
@@ -0,0 +1,114 @@
+import pygame
+
+LEFT_BUTTON = 1
+AUTOPILOT_KEY = pygame.K_TAB
+
+
+class InputSnapshot:
+    '''
+    Class keeping input of the player during one tick.
+    Keys pressed during the tick are kept with the time of the press
+    in milliseconds, so a tap shorter than a tick is never lost.
+    '''
+    def __init__(self, pressed=None, held=(), mouse_pos=(0, 0), clicks=()):
+        '''
+        Function initializing the snapshot.
+        '''
+        self.pressed = {} if pressed is None else pressed
+        self.held = frozenset(held)
+        self.mouse_pos = mouse_pos
+        self.clicks = tuple(clicks)
+
+    def wasPressed(self, *keys):
+        '''
+        Function checking if any of the keys was pressed during the tick.
+        '''
+        for key in keys:
+            if key in self.pressed:
+                return True
+        return False
+
+    def isHeld(self, *keys):
+        '''
+        Function checking if any of the keys is held down
+        or was at least pressed during the tick.
+        '''
+        for key in keys:
+            if key in self.held or key in self.pressed:
+                return True
+        return False
+
+    def pressTime(self, *keys):
+        '''
+        Function returning time of the earliest press of the keys,
+        or None if none of them was pressed during the tick.
+        '''
+        times = [self.pressed[key] for key in keys if key in self.pressed]
+        return min(times) if times else None
+
+    def clicked(self, rect, button=LEFT_BUTTON):
+        '''
+        Function checking if the rectangle was clicked during the tick.
+        '''
+        for pos, clicked_button, time in self.clicks:
+            if clicked_button == button and rect.collidepoint(pos):
+                return True
+        return False
+
+
+class InputManager:
+    '''
+    Class collecting keyboard and mouse events of the main loop
+    and handing them out as one snapshot per tick.
+    Events which came since the previous tick belong to the next
+    snapshot, so they are handled by the earliest possible tick.
+    Mouse positions are changed by transform, if it is given.
+    '''
+    def __init__(self, transform=None):
+        '''
+        Function initializing the manager.
+        '''
+        self.transform = transform
+        self.held = set()
+        self.mouse_pos = (0, 0)
+        self.pressed = {}
+        self.clicks = []
+
+    def handleEvent(self, event):
+        '''
+        Function saving the event for the next snapshot.
+        '''
+        if event.type == pygame.KEYDOWN:
+            self.held.add(event.key)
+            self.pressed.setdefault(event.key, pygame.time.get_ticks())
+        elif event.type == pygame.KEYUP:
+            self.held.discard(event.key)
+        elif event.type == pygame.MOUSEMOTION:
+            self.mouse_pos = self.position(event.pos)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self.mouse_pos = self.position(event.pos)
+            self.clicks.append((self.mouse_pos, event.button,
+                                pygame.time.get_ticks()))
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.held.clear()
+
+    def position(self, position):
+        '''
+        Function returning position of the mouse in the game.
+        '''
+        if self.transform is None:
+            return position
+        return self.transform(position)
+
+    def snapshot(self):
+        '''
+        Function returning input of the next tick
+        and forgetting presses and clicks handed out in it.
+        '''
+        snapshot = InputSnapshot(self.pressed, self.held, self.mouse_pos,
+                                 self.clicks)
+        if self.pressed:
+            self.pressed = {}
+        if self.clicks:
+            self.clicks = []
+        return snapshot
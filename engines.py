@@ -0,0 +1,9 @@
+from flappybird import FlappyBirdEngine
+from skybird import SkyBirdEngine
+from spikes import SpikesBirdEngine
+
+ENGINES = {
+    'flappy': FlappyBirdEngine,
+    'skybird': SkyBirdEngine,
+    'spikes': SpikesBirdEngine,
+}
@@ -0,0 +1,165 @@
+import os
+import sys
+import random
+import argparse
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+from rollout import spikesPolicy
+from levels import CHUNK_SIZE
+from flappybird import (FlappyBirdEngine, JUMP, NOTHING, SIZE, BIRD_SIZE,
+                        OBSTACLE_WIDTH, PARTS_DISTANCE)
+from spikes import SpikesBirdEngine
+from flappybatch import FlappyBirdBatch, BIRD_X
+from spikesbatch import SpikesBirdBatch
+
+BIRDS = 50
+MAX_TICKS = 8000
+NOISE = 0.02
+GAP_MARGIN = (10, 60)
+MIN_TICKS = 5000
+MIN_SCORE = 2 * CHUNK_SIZE + 1
+
+
+class BatchSpikes:
+    '''
+    Class giving a SpikesBirdEngine the spikes drawn by one game
+    of a SpikesBirdBatch, used in place of the random generator
+    of the engine.
+    '''
+    def __init__(self, batch, game):
+        '''
+        Function initializing spikes of the game of the batch.
+        '''
+        self.batch = batch
+        self.game = game
+
+    def sample(self, population, number):
+        '''
+        Function returning slots of the spikes of the game.
+        '''
+        return [int(slot) for slot in
+                np.nonzero(self.batch.spikes[self.game])[0]]
+
+
+def flappyGapPolicy(state, rng):
+    '''
+    Policy keeping the bottom of the bird a random distance
+    from GAP_MARGIN, above the bottom of the nearest gap.
+    Before the first obstacle the gap is in the middle of the window.
+    Birds survive every level, but each of them flies differently.
+    '''
+    target = (SIZE[1] + PARTS_DISTANCE) // 2
+    for x, top, bottom in state['obstacles']:
+        if x + OBSTACLE_WIDTH >= BIRD_X:
+            target = bottom
+            break
+    if state['bird_y'] + BIRD_SIZE > target - rng.randint(*GAP_MARGIN):
+        return JUMP
+    return NOTHING
+
+
+def noisySpikesPolicy(state, rng):
+    '''
+    Policy playing like the Spikes heuristic, but changing its action
+    to the other one with probability NOISE.
+    '''
+    action = spikesPolicy(state, rng)
+    if rng.random() < NOISE:
+        return NOTHING if action == JUMP else JUMP
+    return action
+
+
+def compareGames(policy, batch, engines, position, max_ticks):
+    '''
+    Function playing every engine and the batch with the same actions
+    of the policy and returning number of ticks in which they differ.
+    position returns (bird x, bird y) of the engine.
+    '''
+    rngs = [random.Random(i) for i in range(len(engines))]
+    mismatches = 0
+    for tick in range(max_ticks):
+        if not batch.alive.any():
+            break
+        actions = [policy(engine.getState(), rng)
+                   if not engine.gameover else NOTHING
+                   for engine, rng in zip(engines, rngs)]
+        batch.step(np.array(actions) == JUMP)
+        for i, engine in enumerate(engines):
+            engine.step(actions[i])
+            x, y = position(engine)
+            if ((x is not None and x != batch.x[i]) or y != batch.y[i] or
+                    engine.score != batch.score[i] or
+                    engine.ticks != batch.ticks[i] or
+                    engine.gameover == batch.alive[i]):
+                mismatches += 1
+    return mismatches
+
+
+def checkFlappy(birds=BIRDS, seed=0, max_ticks=MAX_TICKS):
+    '''
+    Function comparing FlappyBirdBatch with FlappyBirdEngine
+    and returning number of differing ticks and the batch.
+    '''
+    batch = FlappyBirdBatch(birds, seed)
+    engines = [FlappyBirdEngine(seed=seed) for i in range(birds)]
+    return compareGames(flappyGapPolicy, batch, engines,
+                        lambda engine: (None, engine.bird.rect.y),
+                        max_ticks), batch
+
+
+def checkSpikes(birds=BIRDS, seed=0, max_ticks=MAX_TICKS):
+    '''
+    Function comparing SpikesBirdBatch with SpikesBirdEngine
+    and returning number of differing ticks and the batch.
+    Engines take their spikes from the batch, because both
+    draw them with different random generators.
+    '''
+    batch = SpikesBirdBatch(birds, seed)
+    engines = []
+    for i in range(birds):
+        engine = SpikesBirdEngine(seed=seed)
+        engine.random = BatchSpikes(batch, i)
+        engine.spawnSpikes()
+        engines.append(engine)
+    return compareGames(noisySpikesPolicy, batch, engines,
+                        lambda engine: engine.bird.rect.topleft,
+                        max_ticks), batch
+
+
+CHECKS = {'flappy': checkFlappy, 'spikes': checkSpikes}
+
+# Every bird of the check has to play at least (ticks, score),
+# so FlappyBird levels reach the third chunk of the level stream.
+# Spikes has no level stream and the game gets harder quickly.
+COVERAGE = {'flappy': (MIN_TICKS, MIN_SCORE), 'spikes': (0, 0)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that batch simulations follow the engines.")
+    parser.add_argument('--birds', type=int, default=BIRDS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS)
+    args = parser.parse_args()
+
+    failed = False
+    for name, check in CHECKS.items():
+        mismatches, batch = check(args.birds, args.seed, args.max_ticks)
+        ticks = int(batch.ticks.min())
+        score = int(batch.score.min())
+        print('%-8s %d mismatches, every bird played %d ticks '
+              'and scored %d' % (name, mismatches, ticks, score))
+        min_ticks, min_score = COVERAGE[name]
+        if ticks < min_ticks or score < min_score:
+            print('%-8s birds died too early, required %d ticks '
+                  'and score %d' % (name, min_ticks, min_score))
+            failed = True
+        failed = failed or mismatches > 0
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import random
+import numpy as np
+from flappybird import (SIZE, BIRD_SIZE, MOVE_SPEED, JUMP_VELOCITY, GRAVITY,
+                        PARTS_DISTANCE, OBSTACLE_WIDTH, OBSTACLE_HEIGHT,
+                        gapPosition)
+from levels import LevelStream
+
+BIRD_X = 150
+SPAWN_TIME = 160
+
+
+def roundPosition(position):
+    '''
+    Function rounding positions the same way as pygame.Rect does
+    (halves are rounded away from zero).
+    '''
+    return np.where(position >= 0, np.floor(position + 0.5),
+                    np.ceil(position - 0.5))
+
+
+class FlappyBirdBatch:
+    '''
+    Class simulating many birds of FlappyBird at once with NumPy arrays.
+    All birds fly through the same stream of obstacles and follow the same
+    rules as FlappyBirdEngine, but every tick is a few array operations
+    instead of a Python loop over birds.
+    '''
+    def __init__(self, number, seed=None, size=SIZE):
+        '''
+        Function initializing the simulation of the given number of birds.
+        '''
+        self.number = number
+        self.width, self.height = size
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        self.level = LevelStream(seed, gapPosition)
+        start_y = self.height // 2 - BIRD_SIZE // 2
+        self.y = np.full(number, start_y, dtype=np.float64)
+        self.velocity_y = np.zeros(number, dtype=np.float64)
+        self.alive = np.ones(number, dtype=bool)
+        self.score = np.zeros(number, dtype=np.int64)
+        self.ticks = np.zeros(number, dtype=np.int64)
+        self.obstacles_x = np.zeros(0, dtype=np.int64)
+        self.obstacles_gap = np.zeros(0, dtype=np.int64)
+        self.obstacles_number = np.zeros(0, dtype=np.int64)
+        self.time = 0
+        self.steps = 0
+        self.obstacle_number = 1
+
+    def spawnObstacles(self):
+        '''
+        Function spawning obstacles shared by all birds.
+        '''
+        if self.time == SPAWN_TIME:
+            gap = self.level.get(self.obstacle_number)
+            self.obstacles_x = np.append(self.obstacles_x, self.width)
+            self.obstacles_gap = np.append(self.obstacles_gap, gap)
+            self.obstacles_number = np.append(self.obstacles_number,
+                                              self.obstacle_number)
+            self.time = 0
+            self.obstacle_number += 1
+        self.time += 1
+
+    def moveObstacles(self):
+        '''
+        Function moving obstacles and removing the one which left the window.
+        '''
+        self.obstacles_x -= MOVE_SPEED
+        if len(self.obstacles_x) > 0:
+            if self.obstacles_x[0] + OBSTACLE_WIDTH < 0:
+                self.obstacles_x = self.obstacles_x[1:]
+                self.obstacles_gap = self.obstacles_gap[1:]
+                self.obstacles_number = self.obstacles_number[1:]
+
+    def findCollisions(self):
+        '''
+        Function returning mask of birds colliding with obstacles or window.
+        '''
+        top = self.y
+        bottom = self.y + BIRD_SIZE
+        dead = (bottom > self.height) | (top < 0)
+        for x, gap in zip(self.obstacles_x, self.obstacles_gap):
+            if x < BIRD_X + BIRD_SIZE and BIRD_X < x + OBSTACLE_WIDTH:
+                lower_top = gap + PARTS_DISTANCE
+                dead |= (top < gap) & (bottom > gap - OBSTACLE_HEIGHT)
+                dead |= ((bottom > lower_top) &
+                         (top < lower_top + OBSTACLE_HEIGHT))
+        return dead
+
+    def moveBirds(self, jump, alive):
+        '''
+        Function applying jumps and gravity to living birds.
+        '''
+        velocity = np.where(jump, JUMP_VELOCITY, self.velocity_y) + GRAVITY
+        self.velocity_y = np.where(alive, velocity, self.velocity_y)
+        self.y = np.where(alive, roundPosition(self.y + self.velocity_y),
+                          self.y)
+
+    def checkScore(self, alive):
+        '''
+        Function updating scores of living birds.
+        '''
+        passed = self.obstacles_x + OBSTACLE_WIDTH < BIRD_X
+        if passed.any():
+            best = self.obstacles_number[passed].max()
+            self.score = np.where(alive & (self.score < best), best,
+                                  self.score)
+
+    def step(self, jump=False):
+        '''
+        Function simulating one tick for all birds.
+        jump can be one value for all birds or an array with value per bird.
+        Returns number of birds which are still alive.
+        '''
+        alive = self.alive.copy()
+        jump = np.broadcast_to(np.asarray(jump, dtype=bool), alive.shape)
+        self.spawnObstacles()
+        self.moveObstacles()
+        dead = self.findCollisions() & alive
+        self.moveBirds(jump, alive)
+        self.checkScore(alive)
+        self.ticks += alive
+        self.alive &= ~dead
+        self.steps += 1
+        return int(self.alive.sum())
+
+    def nextObstacle(self):
+        '''
+        Function returning the nearest obstacle which birds did not pass
+        as (left, gap top, gap bottom) or None.
+        '''
+        ahead = np.nonzero(self.obstacles_x + OBSTACLE_WIDTH >= BIRD_X)[0]
+        if len(ahead) == 0:
+            return None
+        i = ahead[0]
+        return (int(self.obstacles_x[i]), int(self.obstacles_gap[i]),
+                int(self.obstacles_gap[i]) + PARTS_DISTANCE)
+
+    def getState(self):
+        '''
+        Function returning current state of all birds as arrays.
+        '''
+        return {
+            'y': self.y,
+            'velocity_y': self.velocity_y,
+            'alive': self.alive,
+            'score': self.score,
+            'ticks': self.ticks,
+            'obstacles': [(int(x), int(gap), int(gap) + PARTS_DISTANCE)
+                          for x, gap in zip(self.obstacles_x,
+                                            self.obstacles_gap)],
+        }
+
+    def run(self, policy, max_ticks):
+        '''
+        Function running the simulation until all birds die or
+        max_ticks pass. policy is called every tick with the simulation
+        and returns jumps of the birds.
+        '''
+        while self.alive.any() and self.steps < max_ticks:
+            self.step(policy(self))
+        return self.score
@@ -1,14 +1,46 @@
 import pygame
 import random
-import os
+import assets
+import fonts
+import scores
+from replay import Recorder
+from controls import AUTOPILOT_KEY
+from autopilot import Autopilot, Plan
+from timestep import interpolate
+from spatial import findRange
+from pool import RingBuffer
+from levels import LevelStream
 
 WHITE = (255, 255, 255)
 LIGHT_BLUE = (100, 100, 230)
 
+GAMEOVER_TIME = 240
+GAMEOVER_HINT = "Press \'R\' to play again or \'ESC\' to go back to menu."
+SCORE_NAME = 'flappy'
+
+SIZE = (800, 600)
+BIRD_SIZE = 50
 MOVE_SPEED = 2
 JUMP_VELOCITY = -3
 GRAVITY = 0.1
 PARTS_DISTANCE = 200
+OBSTACLE_WIDTH = 80
+OBSTACLE_HEIGHT = 600
+OBSTACLES_CAPACITY = 8
+
+NOTHING = 0
+JUMP = 1
+
+
+def preloadAssets():
+    '''
+    Function loading images and fonts of the game into the caches.
+    '''
+    assets.loadImage('skybird.png', (BIRD_SIZE, BIRD_SIZE))
+    assets.loadImage('obstacle.png', (OBSTACLE_WIDTH, OBSTACLE_HEIGHT))
+    assets.loadImage('obstacle.png', (OBSTACLE_WIDTH, OBSTACLE_HEIGHT), 180)
+    fonts.getFont(300)
+    fonts.getFont(30)
 
 
 class Bird:
@@ -19,9 +51,8 @@ class Bird:
         '''
         Function initializing a bird.
         '''
-        self.photo = pygame.image.load(os.path.join('Assets', 'skybird.png'))
         self.rect = pygame.rect.Rect(0, 0, size, size)
-        self.photo = pygame.transform.scale(self.photo, (size, size))
+        self.previous = self.rect.topleft
         self.velocity_y = 0
         self.velocity_x = 0
 
@@ -38,49 +69,69 @@ class Bird:
         self.velocity_y += GRAVITY
         self.rect.y += self.velocity_y
 
-    def draw(self, screen):
+    def drawPosition(self, alpha=1):
+        '''
+        Function returning position of the bird between
+        its previous and current position.
+        '''
+        return (interpolate(self.previous[0], self.rect.x, alpha),
+                interpolate(self.previous[1], self.rect.y, alpha))
+
+    def savePosition(self):
         '''
-        Function drawing bird.
+        Function saving position of the bird before the next tick.
         '''
-        screen.blit(self.photo, (self.rect.x, self.rect.y))
+        self.previous = self.rect.topleft
 
 
 class Obstacle:
     '''
     Class defining Obstacle exising in game FlappyBird
+    Obstacles are recycled, so spawn sets every attribute again.
     '''
-    def __init__(self, number):
+    __slots__ = ('width', 'height', 'upper_rect', 'lower_rect', 'number',
+                 'rand', 'previous_x')
+
+    def __init__(self, number=0):
         '''
         Function initializing obstacle.
         '''
-        self.width = 80
-        self.height = 600
+        self.width = OBSTACLE_WIDTH
+        self.height = OBSTACLE_HEIGHT
         self.upper_rect = pygame.rect.Rect(0, 0, self.width, self.height)
         self.lower_rect = pygame.rect.Rect(0, 0, self.width, self.height)
+        self.number = number
 
-        self.lower_photo = pygame.image.load(os.path.join('Assets',
-                                                          'obstacle.png'))
-        self.lower_photo = pygame.transform.scale(self.lower_photo,
-                                                  (self.width, self.height))
-        self.upper_photo = pygame.transform.rotate(self.lower_photo, 180)
+    def spawn(self, number, rand, window):
+        '''
+        Function spawning obstacle with the gap starting at rand.
+        '''
         self.number = number
+        self.place(rand, window.right)
+        self.savePosition()
 
-    def spawn(self, window):
+    def place(self, rand, x):
         '''
-        Function spawning obstacle.
+        Function placing obstacle with the gap starting at rand.
         '''
-        self.rand = random.randint(50, 550-PARTS_DISTANCE)
+        self.rand = rand
         self.upper_rect.bottom = self.rand
-        self.upper_rect.left = window.right
+        self.upper_rect.left = x
         self.lower_rect.top = self.rand + PARTS_DISTANCE
-        self.lower_rect.left = window.right
+        self.lower_rect.left = x
+
+    def savePosition(self):
+        '''
+        Function saving position of the obstacle before the next tick.
+        '''
+        self.previous_x = self.lower_rect.x
 
-    def draw(self, screen):
+    def drawPosition(self, alpha=1):
         '''
-        Function drawing obstacle on the screen.
+        Function returning horizontal position of the obstacle between
+        its previous and current position.
         '''
-        screen.blit(self.lower_photo, (self.lower_rect.x, self.lower_rect.y))
-        screen.blit(self.upper_photo, (self.upper_rect.x, self.upper_rect.y))
+        return interpolate(self.previous_x, self.lower_rect.x, alpha)
 
     def move(self):
         '''
@@ -90,107 +141,160 @@ class Obstacle:
         self.lower_rect.x -= MOVE_SPEED
 
 
-class FlappyBird:
+def gapPosition(rng):
     '''
-    Class defining the game of FlappyBird.'''
-    def __init__(self, screen):
-        '''
-        Function initializing the game.
-        '''
-        self.screen = screen
-        self.window = self.screen.get_rect()
-        self.bird = Bird(50)
-        self.obstacles = []
+    Function generating top of the gap of an obstacle.
+    '''
+    return rng.randint(50, 550-PARTS_DISTANCE)
+
+
+def autopilotValue(engine):
+    '''
+    Function rating state for the autopilot by distance of the bird
+    from the middle of the nearest gap in front of it.
+    '''
+    target = engine.window.centery
+    for obs in engine.obstacles:
+        if obs.lower_rect.right >= engine.bird.rect.left:
+            target = obs.rand + PARTS_DISTANCE / 2
+            break
+    return -abs(engine.bird.rect.centery - target)
+
+
+AUTOPILOT_PLAN = Plan((NOTHING, JUMP), (JUMP,), autopilotValue, 8, 4)
+
+
+def obstacleX(obstacle):
+    '''
+    Function returning horizontal position of the obstacle.
+    '''
+    return obstacle.lower_rect.x
+
+
+class FlappyBirdEngine:
+    '''
+    Class simulating the game of FlappyBird.
+    It does not draw anything and does not read the keyboard,
+    so it works without the pygame display.
+    '''
+    def __init__(self, window=None, seed=None):
+        '''
+        Function initializing the simulation.
+        The same seed and the same actions always give the same game.
+        '''
+        if window is None:
+            window = pygame.rect.Rect((0, 0), SIZE)
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        self.window = window
+        self.seed = seed
+        self.level = LevelStream(seed, gapPosition)
+        self.bird = Bird(BIRD_SIZE)
+        self.obstacles = RingBuffer(Obstacle, OBSTACLES_CAPACITY)
         self.time = 0
         self.bird.rect.centery = self.window.centery
         self.bird.rect.x = 150
+        self.bird.savePosition()
         self.number = 1
         self.score = 0
+        self.ticks = 0
         self.gameover = False
-        self.downloadBestScore()
+        self.cause = None
 
-    def downloadBestScore(self):
-        '''
-        Function downloading best score from the text file.
-        '''
-        file = open(os.path.join('best_scores', 'flappy.txt'), 'r')
-        self.best_score = int(file.readline())
-        file.close()
+    def getState(self):
+        '''
+        Function returning current state of the simulation.
+        Obstacles are given as (left, gap top, gap bottom).
+        '''
+        return {
+            'ticks': self.ticks,
+            'score': self.score,
+            'gameover': self.gameover,
+            'bird_y': self.bird.rect.y,
+            'velocity_y': self.bird.velocity_y,
+            'obstacles': [(obs.lower_rect.x, obs.upper_rect.bottom,
+                           obs.lower_rect.top) for obs in self.obstacles],
+        }
 
-    def checkBestScore(self):
-        '''
-        Function checking if the currect score is greater than the best score.
-        '''
-        if self.score >= self.best_score:
-            self.best_score = self.score
-            file = open(os.path.join('best_scores', 'flappy.txt'), 'w')
-            file.write(str(self.score))
-            file.close()
+    def getSnapshot(self):
+        '''
+        Function returning simulation state as a flat tuple of numbers,
+        which can be restored by setSnapshot.
+        '''
+        return (self.ticks, self.time, self.number, self.score,
+                self.gameover, self.cause, self.bird.rect.x,
+                self.bird.rect.y, self.bird.previous[0],
+                self.bird.previous[1], self.bird.velocity_y,
+                tuple((obs.number, obs.lower_rect.x, obs.previous_x, obs.rand)
+                      for obs in self.obstacles),
+                self.seed)
 
-    def drawWindow(self):
-        '''
-        Function drawing window of FlappyBird game.
-        '''
-        self.screen.fill(LIGHT_BLUE)
-        if self.gameover:
-            self.drawScore()
-        else:
-            self.drawGame()
-        pygame.display.flip()
+    def setSnapshot(self, snapshot):
+        '''
+        Function restoring simulation state saved by getSnapshot.
+        '''
+        (self.ticks, self.time, self.number, self.score, self.gameover,
+         self.cause, x, y, previous_x, previous_y, self.bird.velocity_y,
+         obstacles, seed) = snapshot
+        self.bird.rect.topleft = (x, y)
+        self.bird.previous = (previous_x, previous_y)
+        self.obstacles.clear()
+        for number, x, previous_x, rand in obstacles:
+            obs = self.obstacles.push()
+            obs.number = number
+            obs.place(rand, x)
+            obs.previous_x = previous_x
+        if seed != self.seed:
+            self.seed = seed
+            self.level = LevelStream(seed, gapPosition)
 
-    def drawGame(self):
+    def savePositions(self):
         '''
-        Function drawing game of FlappyBird.
+        Function saving positions of the bird and obstacles,
+        so they can be drawn between two ticks.
         '''
-        self.drawScore()
-        self.bird.draw(self.screen)
+        self.bird.savePosition()
         for obs in self.obstacles:
-            obs.draw(self.screen)
-
-    def drawScore(self):
-        '''
-        Function drawing score.
-        '''
-        self.scorefont = pygame.font.SysFont('comicsans', 300)
-        self.score_text = self.scorefont.render(str(self.score), 1, WHITE)
-        self.score_box = self.score_text.get_rect()
-        self.score_box.center = self.window.center
-        self.screen.blit(self.score_text, (self.score_box.x, self.score_box.y))
+            obs.savePosition()
 
     def spawnObstacles(self):
         '''
         Function spawning obstacles.
         '''
         if self.time == 160:
-            obs = Obstacle(self.number)
-            obs.spawn(self.window)
-            self.obstacles.append(obs)
+            obs = self.obstacles.push()
+            obs.spawn(self.number, self.level.get(self.number), self.window)
             self.time = 0
             self.number += 1
         self.time += 1
 
-    def handleBird(self):
+    def handleBird(self, action):
         '''
         Function handling controlling a bird.
         '''
-        self.keys_pressed = pygame.key.get_pressed()
-        if self.keys_pressed[pygame.K_SPACE] or self.keys_pressed[pygame.K_w]:
+        if action == JUMP:
             self.bird.jump()
         self.bird.gravity()
 
     def controlCollisions(self):
         '''
         Function controlling collisions between obstacles, bird and window.
-        '''
-        for obs in self.obstacles:
+        Obstacles are sorted by position, so only the ones
+        overlapping the bird horizontally are checked.
+        '''
+        start, end = findRange(self.obstacles,
+                               self.bird.rect.left - OBSTACLE_WIDTH,
+                               self.bird.rect.right, obstacleX)
+        for i in range(start, end):
+            obs = self.obstacles[i]
             if obs.lower_rect.colliderect(self.bird.rect):
-                self.gameOver()
+                self.gameOver('obstacle')
             if obs.upper_rect.colliderect(self.bird.rect):
-                self.gameOver()
+                self.gameOver('obstacle')
         if self.bird.rect.bottom > self.window.bottom:
-            self.gameOver()
+            self.gameOver('floor')
         if self.bird.rect.top < self.window.top:
-            self.gameOver()
+            self.gameOver('ceiling')
 
     def moveObstacles(self):
         '''
@@ -200,32 +304,169 @@ class FlappyBird:
             obs.move()
         if len(self.obstacles) > 0:
             if self.obstacles[0].lower_rect.right < self.window.left:
-                self.obstacles[:] = self.obstacles[1:]
+                self.obstacles.popleft()
 
     def checkScore(self):
         '''
         Function updating score.
+        The last obstacle passed by the bird has the highest number.
+        '''
+        start, passed = findRange(self.obstacles, float('-inf'),
+                                self.bird.rect.left - OBSTACLE_WIDTH,
+                                obstacleX)
+        if passed > 0:
+            if self.obstacles[passed - 1].number > self.score:
+                self.score = self.obstacles[passed - 1].number
+
+    def gameOver(self, cause):
+        '''
+        Function finishing the game
+        and remembering what the bird hit first.
+        '''
+        if not self.gameover:
+            self.cause = cause
+        self.gameover = True
+
+    def step(self, action=NOTHING):
+        '''
+        Function simulating one tick of the game with the given action.
+        '''
+        if self.gameover:
+            return
+        self.savePositions()
+        self.spawnObstacles()
+        self.moveObstacles()
+        self.controlCollisions()
+        self.handleBird(action)
+        self.checkScore()
+        self.ticks += 1
+
+
+class FlappyBird(FlappyBirdEngine):
+    '''
+    Class defining the game of FlappyBird.'''
+    def __init__(self, screen, seed=None):
         '''
+        Function initializing the game.
+        '''
+        self.screen = screen
+        FlappyBirdEngine.__init__(self, self.screen.get_rect(), seed)
+        self.recorder = Recorder(SCORE_NAME, self.seed)
+        self.bird_photo = assets.loadImage('skybird.png',
+                                           (BIRD_SIZE, BIRD_SIZE))
+        self.lower_photo = assets.loadImage('obstacle.png',
+                                            (OBSTACLE_WIDTH, OBSTACLE_HEIGHT))
+        self.upper_photo = assets.loadImage('obstacle.png',
+                                            (OBSTACLE_WIDTH, OBSTACLE_HEIGHT),
+                                            180)
+        self.gameover_time = 0
+        self.finished = False
+        self.restart = False
+        self.autopilot = Autopilot(FlappyBirdEngine, AUTOPILOT_PLAN, self.window)
+        self.downloadBestScore()
+
+    def downloadBestScore(self):
+        '''
+        Function downloading best score from the score store.
+        '''
+        self.best_score = scores.getStore().getBest(SCORE_NAME)
+
+    def checkBestScore(self):
+        '''
+        Function checking if the currect score is greater than the best score.
+        Games played with the autopilot are not saved.
+        '''
+        if self.autopilot.used:
+            return
+        if scores.getStore().submit(SCORE_NAME, self.score, self.ticks):
+            self.best_score = self.score
+
+    def drawWindow(self, alpha=1):
+        '''
+        Function drawing window of FlappyBird game.
+        '''
+        self.screen.fill(LIGHT_BLUE)
+        if self.gameover:
+            self.drawScore()
+            self.drawGameOverHint()
+        else:
+            self.drawGame(alpha)
+
+    def drawGame(self, alpha=1):
+        '''
+        Function drawing game of FlappyBird.
+        '''
+        self.drawScore()
+        self.screen.blit(self.bird_photo, self.bird.drawPosition(alpha))
+        layer = []
         for obs in self.obstacles:
-            if obs.lower_rect.right < self.bird.rect.left:
-                if obs.number > self.score:
-                    self.score = obs.number
+            x = obs.drawPosition(alpha)
+            layer.append((self.lower_photo, (x, obs.lower_rect.y)))
+            layer.append((self.upper_photo, (x, obs.upper_rect.y)))
+        self.screen.blits(layer)
 
-    def gameOver(self):
+    def drawScore(self):
         '''
-        Function finishing the game
+        Function drawing score.
+        '''
+        self.score_text = fonts.renderText(str(self.score), 300, WHITE)
+        self.score_box = self.score_text.get_rect()
+        self.score_box.center = self.window.center
+        self.screen.blit(self.score_text, (self.score_box.x, self.score_box.y))
+
+    def drawGameOverHint(self):
+        '''
+        Function drawing hint on the game over screen.
+        '''
+        self.hint_text = fonts.renderText(GAMEOVER_HINT, 30, WHITE)
+        self.hint_box = self.hint_text.get_rect()
+        self.hint_box.centerx = self.window.centerx
+        self.hint_box.bottom = self.window.bottom - 20
+        self.screen.blit(self.hint_text, (self.hint_box.x, self.hint_box.y))
+
+    def readAction(self, inputs):
+        '''
+        Function reading action of the player from the input of the tick.
+        The bird jumps only when the key is pressed, holding it does nothing.
+        '''
+        if self.autopilot.enabled:
+            return self.autopilot.nextAction(self)
+        if inputs.wasPressed(pygame.K_SPACE, pygame.K_w):
+            return JUMP
+        return NOTHING
+
+    def startGameOver(self):
+        '''
+        Function starting the game over screen.
         '''
         self.checkBestScore()
-        self.gameover = True
-        pygame.time.delay(2000)
+        self.recorder.save(self.score, self.ticks)
+        self.gameover_time = GAMEOVER_TIME
+
+    def countGameOver(self, inputs):
+        '''
+        Function counting down the game over screen.
+        The player can skip it or restart the game immediately.
+        '''
+        if inputs.wasPressed(pygame.K_r):
+            self.restart = True
+        elif inputs.wasPressed(pygame.K_ESCAPE, pygame.K_RETURN):
+            self.finished = True
+        self.gameover_time -= 1
+        if self.gameover_time <= 0:
+            self.finished = True
 
-    def actions(self):
+    def actions(self, inputs):
         '''
         Function performing actions in the game
         '''
         if not self.gameover:
-            self.spawnObstacles()
-            self.moveObstacles()
-            self.controlCollisions()
-            self.handleBird()
-            self.checkScore()
+            if inputs.wasPressed(AUTOPILOT_KEY):
+                self.autopilot.toggle()
+            action = self.readAction(inputs)
+            self.recorder.record(action, self)
+            self.step(action)
+            if self.gameover:
+                self.startGameOver()
+        else:
+            self.countGameOver(inputs)
@@ -0,0 +1,48 @@
+import pygame
+from collections import OrderedDict
+
+FONT_NAME = 'comicsans'
+TEXT_CACHE_SIZE = 64
+
+_fonts = {}
+_texts = OrderedDict()
+
+
+def getFont(size, name=FONT_NAME):
+    '''
+    Function returning font of the given name and size.
+    System font lookup is done only once for every (name, size).
+    '''
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+
+def renderText(text, size, color, name=FONT_NAME):
+    '''
+    Function returning rendered text.
+    Recently rendered texts are kept in a bounded LRU cache,
+    so an unchanged text is rendered only once.
+    Returned surfaces are shared, so they must not be modified.
+    '''
+    key = (text, size, color, name)
+    surface = _texts.get(key)
+    if surface is not None:
+        _texts.move_to_end(key)
+        return surface
+    surface = getFont(size, name).render(text, 1, color)
+    _texts[key] = surface
+    if len(_texts) > TEXT_CACHE_SIZE:
+        _texts.popitem(last=False)
+    return surface
+
+
+def clearCache():
+    '''
+    Function removing every font and rendered text from the cache.
+    '''
+    _fonts.clear()
+    _texts.clear()
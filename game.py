@@ -1,5 +1,15 @@
+import time
 import pygame
+import scores
+import loader
+from startup import StartupTimer
+from controls import InputManager
+from pacing import FramePacer
 from menumanager import GameManager
+from renderer import Renderer, ResolutionScaler
+from timestep import FixedTimestep
+from profiler import (FrameProfiler, PROFILE_FILE, OVERLAY_KEY,
+                      EVENTS, ACTIONS, DRAW, PRESENT)
 
 SIZE = (800, 600)
 FPS = 120
@@ -10,32 +20,136 @@ class Game:
     Class executing the game and containing the main loop.
     Main class of the game.
     '''
-    def __init__(self):
+    def __init__(self, fps=FPS, profile=None, startup_report=None,
+                 vsync=False, pacing_report=None, window_size=None,
+                 dynamic_resolution=False, player=scores.DEFAULT_PLAYER):
         '''
         Function initializing the class.
+        Simulation always runs at TICK_RATE ticks per second,
+        fps is only the highest rate of drawing the window.
+        If profile is a path, times of frames are measured from the start
+        and their summary is written there on exit.
+        If startup_report is a path, startup times are written there on exit.
+        If vsync is True, presenting is synchronized with the display
+        when the driver supports it.
+        If pacing_report is a path, achieved pacing is written there on exit.
+        Games always see a window of SIZE, if window_size is different,
+        frames are scaled to it. If dynamic_resolution is True,
+        frames are drawn in lower resolution when drawing is too slow.
+        Finished runs are saved in the score store under the player name.
         '''
+        self.fps = fps
+        self.profile = profile
+        self.startup_report = startup_report
+        self.pacing_report = pacing_report
+        self.startup = StartupTimer()
+        self.profiler = None
+        if profile is not None:
+            self.profiler = FrameProfiler()
         pygame.display.set_caption("BIRD GAMES")
-        self.screen = pygame.display.set_mode(SIZE)
-        self.manager = GameManager(self.screen)
+        self.screen = self.createWindow(window_size or SIZE, vsync)
+        self.pacer = FramePacer(self.vsync)
+        self.renderer = Renderer(self.screen, SIZE)
+        self.scaler = None
+        if dynamic_resolution:
+            self.scaler = ResolutionScaler(self.renderer)
+        self.inputs = InputManager(self.renderer.toLogical)
+        scores.openStore(player)
+        self.manager = GameManager(self.renderer)
 
-    def drawWindow(self):
+    def createWindow(self, size, vsync=False):
+        '''
+        Function creating the window.
+        Vsync needs a window drawn by the SDL renderer,
+        if it is not available, an ordinary window is created.
+        '''
+        self.vsync = False
+        if vsync:
+            try:
+                screen = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+                self.vsync = True
+                return screen
+            except pygame.error:
+                pass
+        return pygame.display.set_mode(size)
+
+    def activeName(self):
+        '''
+        Function returning name of the active game used by the profiler.
+        '''
+        if self.manager.game is None:
+            return 'Menu'
+        return type(self.manager.game).__name__
+
+    def toggleOverlay(self):
+        '''
+        Function showing or hiding the profiler overlay.
+        The profiler is started when the overlay is shown for the first time.
+        '''
+        if self.profiler is None:
+            self.profiler = FrameProfiler()
+        self.profiler.toggleOverlay()
+
+    def drawWindow(self, alpha=1):
         '''
         Function drawing window.
+        Games only record drawing calls, the pixels are drawn
+        by the renderer, so its time counts as drawing. Sending the frame
+        to the display, with waiting for vsync, counts as presenting
+        and the scaler gets the time of drawing without it.
         '''
-        self.manager.drawWindow()
-        pygame.display.flip()
+        if self.scaler is not None:
+            start = time.perf_counter()
+        self.manager.drawWindow(alpha)
+        if self.profiler is not None and self.profiler.overlay:
+            self.profiler.drawOverlay(self.renderer, self.pacer.currentFps())
+        dirty = self.renderer.render()
+        if self.scaler is not None:
+            self.scaler.update((time.perf_counter() - start) * 1000,
+                               self.pacer.frameRate(
+                                   self.manager.frameRate(self.fps)))
+        if self.profiler is not None:
+            self.profiler.mark(DRAW)
+        self.renderer.show(dirty)
+        self.startup.frameShown(self.manager)
 
     def gameLoop(self):
         '''
         Main loop of the function.
         '''
-        self.clock = pygame.time.Clock()
+        self.timestep = FixedTimestep()
         self.run = True
         while self.run:
-            self.clock.tick(FPS)
+            elapsed = self.pacer.wait(self.manager.frameRate(self.fps))
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.startFrame()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.run = False
-            self.manager.actions()
-            self.drawWindow()
+                elif event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY:
+                    self.toggleOverlay()
+                elif event.type == pygame.WINDOWEXPOSED:
+                    self.renderer.invalidate()
+                else:
+                    self.pacer.handleEvent(event)
+                    self.inputs.handleEvent(event)
+            if profiler is not None:
+                profiler.mark(EVENTS)
+            for i in range(self.timestep.advance(elapsed)):
+                self.manager.actions(self.inputs.snapshot())
+            if profiler is not None:
+                profiler.mark(ACTIONS)
+            self.drawWindow(self.timestep.alpha())
+            if profiler is not None:
+                profiler.mark(PRESENT)
+                profiler.endFrame(self.activeName(), elapsed)
+            loader.preloadGames()
+        if self.profiler is not None:
+            self.profiler.writeSummary(self.profile or PROFILE_FILE)
+        if self.startup_report is not None:
+            self.startup.writeReport(self.startup_report)
+        if self.pacing_report is not None:
+            self.pacer.writeStats(self.pacing_report)
+        scores.closeStore()
         pygame.quit()
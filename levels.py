@@ -0,0 +1,46 @@
+import random
+
+CHUNK_SIZE = 16
+
+
+class LevelStream:
+    '''
+    Class generating content of a level, like gaps of obstacles or
+    positions of objects, in chunks of chunk_size items.
+    Every chunk has its own random generator made from the seed and
+    the number of the chunk, so item i is always the same for the same
+    seed, no matter which items were generated before.
+    Only the chunk of the last item and the next one are kept,
+    the next chunk is generated ahead when the stream enters a chunk
+    and chunks behind are dropped, so the memory does not grow
+    with the length of the game.
+    '''
+    def __init__(self, seed, generate, chunk_size=CHUNK_SIZE):
+        '''
+        Function initializing the stream.
+        generate is called with a random generator and returns one item.
+        '''
+        self.seed = seed
+        self.generate = generate
+        self.chunk_size = chunk_size
+        self.chunks = {}
+
+    def createChunk(self, chunk):
+        '''
+        Function generating items of the chunk.
+        '''
+        rng = random.Random('%d/%d' % (self.seed, chunk))
+        return [self.generate(rng) for i in range(self.chunk_size)]
+
+    def get(self, index):
+        '''
+        Function returning item with the given index.
+        '''
+        chunk, offset = divmod(index, self.chunk_size)
+        items = self.chunks.get(chunk)
+        if items is None or chunk + 1 not in self.chunks:
+            self.chunks = {number: self.chunks.get(number) or
+                           self.createChunk(number)
+                           for number in (chunk, chunk + 1)}
+            items = self.chunks[chunk]
+        return items[offset]
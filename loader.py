@@ -0,0 +1,60 @@
+import importlib
+import threading
+import pygame
+
+GAMES = {
+    'flappy': ('flappybird', 'FlappyBird'),
+    'skybird': ('skybird', 'SkyBird'),
+    'spikes': ('spikes', 'SpikesBird'),
+}
+
+_preloader = None
+
+
+def loadGame(name):
+    '''
+    Function returning class of the game, its module is imported
+    when the game is needed for the first time.
+    '''
+    module_name, class_name = GAMES[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def createGame(name, screen, seed=None):
+    '''
+    Function creating the game of the given name.
+    '''
+    return loadGame(name)(screen, seed)
+
+
+def preloadGame(name):
+    '''
+    Function importing the game and loading its images and fonts.
+    Errors are left to the game itself, which loads the same files.
+    '''
+    try:
+        module = importlib.import_module(GAMES[name][0])
+        module.preloadAssets()
+    except (OSError, pygame.error):
+        pass
+
+
+def preloadAll():
+    '''
+    Function preloading every game one after another.
+    '''
+    for name in GAMES:
+        preloadGame(name)
+
+
+def preloadGames():
+    '''
+    Function starting a background thread preloading every game,
+    so starting a game from the menu does not wait for the disk.
+    The thread is started only once.
+    '''
+    global _preloader
+    if _preloader is None:
+        _preloader = threading.Thread(target=preloadAll, daemon=True)
+        _preloader.start()
+    return _preloader
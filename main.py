@@ -1,10 +1,57 @@
-from game import Game
+import startup
+from game import Game, FPS
+from profiler import PROFILE_FILE
+from pacing import PACING_FILE
+import scores
+import argparse
 import pygame
 
+def windowSize(text):
+    '''
+    Function reading size of the window written as WIDTHxHEIGHT.
+    '''
+    try:
+        width, height = (int(value) for value in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("size has to be WIDTHxHEIGHT")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError("size has to be positive")
+    return (width, height)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="BIRD GAMES")
+    parser.add_argument('--fps', type=int, default=FPS,
+                        help="rate of drawing the window")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_FILE,
+                        default=None, metavar='PATH',
+                        help="measure times of frames and write "
+                             "their summary to PATH on exit "
+                             "(F3 shows the overlay)")
+    parser.add_argument('--startup-report', nargs='?',
+                        const=startup.STARTUP_FILE, default=None,
+                        metavar='PATH',
+                        help="write times of the first frames to PATH "
+                             "on exit")
+    parser.add_argument('--vsync', action='store_true',
+                        help="synchronize drawing with the display")
+    parser.add_argument('--pacing-report', nargs='?', const=PACING_FILE,
+                        default=None, metavar='PATH',
+                        help="write achieved rate of frames to PATH on exit")
+    parser.add_argument('--window', type=windowSize, default=None,
+                        metavar='WIDTHxHEIGHT',
+                        help="size of the window, the game is scaled to it")
+    parser.add_argument('--dynamic-resolution', action='store_true',
+                        help="lower resolution of drawing when it is slow")
+    parser.add_argument('--player', default=scores.DEFAULT_PLAYER,
+                        help="name under which finished runs are saved")
+    args = parser.parse_args()
+
     pygame.init()
 
-    game = Game()
+    game = Game(args.fps, args.profile, args.startup_report, args.vsync,
+                args.pacing_report, args.window, args.dynamic_resolution,
+                args.player)
     game.gameLoop()
 
 if __name__ == "__main__":
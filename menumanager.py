@@ -1,9 +1,12 @@
+import time
 import pygame
-import os
+import assets
+import fonts
+import scores
+import loader
+from pacing import IDLE_FPS
+from timestep import interpolate
 from button import Button
-from flappybird import FlappyBird
-from skybird import SkyBird
-from spikes import SpikesBird
 
 GRAVITY = 0.1
 JUMP_VELOCITY = -7
@@ -16,6 +19,10 @@ BUTTON_WIDTH = 200
 BUTTON_HEIGHT = 100
 
 LOGO_Y = 150
+BIRD_SIZE = 300
+MENU_FPS = 60
+
+SCORE_NAMES = ('flappy', 'skybird', 'spikes')
 
 
 class Bird:
@@ -25,9 +32,9 @@ class Bird:
     def __init__(self, size):
         '''
         Function initializing a bird.'''
-        self.photo = pygame.image.load(os.path.join('Assets', 'skybird.png'))
+        self.photo = assets.loadImage('skybird.png', (size, size))
         self.rect = pygame.rect.Rect(0, 0, size, size)
-        self.photo = pygame.transform.scale(self.photo, (size, size))
+        self.previous = self.rect.topleft
         self.velocity_y = 0
         self.velocity_x = 3
         self.direction = 1
@@ -45,11 +52,20 @@ class Bird:
         self.velocity_y += GRAVITY
         self.rect.y += self.velocity_y
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1):
         '''
         Function drawing bird.
+        Bird is drawn between its previous and current position.
         '''
-        screen.blit(self.photo, (self.rect.x, self.rect.y))
+        screen.blit(self.photo,
+                    (interpolate(self.previous[0], self.rect.x, alpha),
+                     interpolate(self.previous[1], self.rect.y, alpha)))
+
+    def savePosition(self):
+        '''
+        Function saving position of the bird before the next tick.
+        '''
+        self.previous = self.rect.topleft
 
     def move(self):
         '''
@@ -72,21 +88,63 @@ class GameManager:
         '''
         self.screen = screen
         self.window = self.screen.get_rect()
-        self.bird = Bird(300)
+        self.bird = Bird(BIRD_SIZE)
         self.bird.rect.center = self.window.center
+        self.bird.savePosition()
         self.game = None
+        self.game_requested = None
+        self.mouse_pos = (0, 0)
         self.createButtons()
+        self.loadLogo()
+        self.createLayer()
 
-    def drawLogo(self):
+    def loadLogo(self):
         '''
-        Function drawing logo of the game.
+        Function loading logo of the game.
         '''
-        self.logo_photo = pygame.image.load(os.path.join('Assets',
-                                                         'birdgames.png'))
+        self.logo_photo = assets.loadImage('birdgames.png')
         self.logo_rect = self.logo_photo.get_rect()
         self.logo_rect.center = self.window.center
         self.logo_rect.y = LOGO_Y
-        self.screen.blit(self.logo_photo, (self.logo_rect.x, self.logo_rect.y))
+
+    def drawLogo(self):
+        '''
+        Function drawing logo of the game.
+        '''
+        self.layer.blit(self.logo_photo, (self.logo_rect.x, self.logo_rect.y))
+
+    def createLayer(self):
+        '''
+        Function creating transparent layer with buttons, logo and
+        describtions, which is drawn over the flying bird.
+        '''
+        self.layer = pygame.Surface(self.window.size, pygame.SRCALPHA)
+        self.layer_area = pygame.rect.Rect(0, self.button1.rect.y,
+                                           self.window.width,
+                                           self.window.bottom -
+                                           self.button1.rect.y)
+        self.hovered = None
+        self.layer_best_score = None
+        self.drawLayer()
+
+    def drawLayer(self):
+        '''
+        Function drawing buttons, logo and describtion of the hovered
+        button on the layer.
+        '''
+        self.layer.fill((0, 0, 0, 0))
+        for button in self.buttons:
+            button.draw(self.layer, button is self.hovered)
+        self.drawLogo()
+        if self.hovered is self.button1:
+            self.drawDescribtionFlappy()
+            self.drawBestScore('flappy')
+        elif self.hovered is self.button2:
+            self.drawDescribtionSkybird()
+            self.drawBestScore('skybird')
+        elif self.hovered is self.button3:
+            self.drawDescribtionSpikes()
+            self.drawBestScore('spikes')
 
     def createButtons(self):
         '''
@@ -98,96 +156,103 @@ class GameManager:
         self.button3 = Button(550, 300, BUTTON_WIDTH, BUTTON_HEIGHT, "SPIKES")
         self.buttons = [self.button1, self.button2, self.button3]
 
-    def drawWindow(self):
+    def drawWindow(self, alpha=1):
         '''
         Function drawing window.
         '''
         if self.game is None:
-            self.screen.fill(LIGHT_BLUE)
-            self.bird.draw(self.screen)
-            for button in self.buttons:
-                button.draw(self.screen)
-            self.drawLogo()
             self.checkMouseCollisions()
+            self.screen.fill(LIGHT_BLUE)
+            self.bird.draw(self.screen, alpha)
+            self.screen.blit(self.layer, (0, 0))
         else:
-            self.game.drawWindow()
+            self.game.drawWindow(alpha)
 
     def drawDescribtionSpikes(self):
         '''
         Function drawing Describtion of the Spike game.
         '''
-        self.desfont = pygame.font.SysFont('comicsans', 30)
-        self.destext = self.desfont.render("Avoid spikes to get points." +
-                                           "Use \'SPACE\' or \'W\'.", 1, WHITE)
+        self.destext = fonts.renderText("Avoid spikes to get points." +
+                                        "Use \'SPACE\' or \'W\'.", 30, WHITE)
         self.desbox = self.destext.get_rect()
         self.desbox.centerx = self.window.centerx
         self.desbox.y = 450
-        self.screen.blit(self.destext, (self.desbox.x, self.desbox.y))
+        self.layer.blit(self.destext, (self.desbox.x, self.desbox.y))
 
     def drawDescribtionFlappy(self):
         '''
         Function drawing Describtion of the Flappybird game.
         '''
-        self.desfont = pygame.font.SysFont('comicsans', 30)
-        self.destext = self.desfont.render("Avoid obstacles and gain points." +
-                                           "Use \'SPACE\' or \'W\'.", 1, WHITE)
+        self.destext = fonts.renderText("Avoid obstacles and gain points." +
+                                        "Use \'SPACE\' or \'W\'.", 30, WHITE)
         self.desbox = self.destext.get_rect()
         self.desbox.centerx = self.window.centerx
         self.desbox.y = 450
-        self.screen.blit(self.destext, (self.desbox.x, self.desbox.y))
+        self.layer.blit(self.destext, (self.desbox.x, self.desbox.y))
 
     def drawDescribtionSkybird(self):
         '''
         Function drawing Describtion of the Skybird game.
         '''
-        self.desfont = pygame.font.SysFont('comicsans', 30)
-        self.destext = self.desfont.render(
+        self.destext = fonts.renderText(
             "Climb up in order to get highest points." +
-            "Use \'A\' and \'D\'.", 1, WHITE)
+            "Use \'A\' and \'D\'.", 30, WHITE)
         self.desbox = self.destext.get_rect()
         self.desbox.centerx = self.window.centerx
         self.desbox.y = 450
-        self.screen.blit(self.destext, (self.desbox.x, self.desbox.y))
+        self.layer.blit(self.destext, (self.desbox.x, self.desbox.y))
 
     def drawBestScore(self, source):
         '''
         Function drawing best score.
         '''
-        file = open(os.path.join('best_scores', source), 'r')
-        self.best_score = int(file.readline())
-        file.close()
-        self.scorefont = pygame.font.SysFont('comicsans', 50)
-        self.score_text = self.scorefont.render("Best score: " + str(self.best_score), 1, WHITE)
+        self.best_score = scores.getStore().getBest(source)
+        self.score_text = fonts.renderText("Best score: " +
+                                           str(self.best_score), 50, WHITE)
         self.score_box = self.score_text.get_rect()
         self.score_box.center = self.window.center
         self.score_box.y = 500
-        self.screen.blit(self.score_text, (self.score_box.x, self.score_box.y))
+        self.layer.blit(self.score_text, (self.score_box.x, self.score_box.y))
 
     def checkMouseCollisions(self):
         '''
         Function checking mouse collisions in main menu.
-        '''
-        if self.button1.checkMouseCollision():
-            self.drawDescribtionFlappy()
-            self.drawBestScore('flappy.txt')
-        if self.button2.checkMouseCollision():
-            self.drawDescribtionSkybird()
-            self.drawBestScore('skybird.txt')
-        if self.button3.checkMouseCollision():
-            self.drawDescribtionSpikes()
-            self.drawBestScore('spikes.txt')
+        The layer is drawn again only when the hovered button
+        or the best score shown under it changes.
+        '''
+        hovered = None
+        for button in self.buttons:
+            if button.checkMouseCollision(self.mouse_pos):
+                hovered = button
+        best_score = None
+        if hovered is not None:
+            best_score = scores.getStore().getBest(
+                SCORE_NAMES[self.buttons.index(hovered)])
+        if (hovered is not self.hovered or
+                best_score != self.layer_best_score):
+            self.hovered = hovered
+            self.layer_best_score = best_score
+            self.drawLayer()
+            self.screen.invalidate(self.layer_area)
 
-    def checkButtonsClick(self):
+    def checkButtonsClick(self, inputs):
         '''
         Function checking if the button is clicked and
         launching the choosen game.
         '''
-        if self.button1.click():
-            self.game = FlappyBird(self.screen)
-        elif self.button2.click():
-            self.game = SkyBird(self.screen)
-        elif self.button3.click():
-            self.game = SpikesBird(self.screen)
+        for button, name in zip(self.buttons, SCORE_NAMES):
+            if button.click(inputs):
+                self.startGame(name)
+                break
+
+    def startGame(self, name):
+        '''
+        Function starting the game of the given name.
+        Time of the request is kept until the first frame of the game
+        is shown, so the startup timer can measure the delay.
+        '''
+        self.game_requested = time.perf_counter()
+        self.game = loader.createGame(name, self.screen)
 
     def checkBirdCollisions(self):
         '''
@@ -200,22 +265,38 @@ class GameManager:
         if self.bird.rect.left <= self.window.left:
             self.bird.changeDirection()
 
+    def frameRate(self, fps):
+        '''
+        Function returning rate of drawing needed now.
+        The menu is drawn at most at MENU_FPS and the still
+        game over screen only at IDLE_FPS.
+        '''
+        if self.game is None:
+            return min(fps, MENU_FPS)
+        if self.game.gameover:
+            return min(fps, IDLE_FPS)
+        return fps
+
     def checkGameOver(self):
         '''
         Function checking gameover.
         '''
-        if self.game.gameover:
+        if self.game.restart:
+            self.game = type(self.game)(self.screen)
+        elif self.game.finished:
             self.game = None
 
-    def actions(self):
+    def actions(self, inputs):
         '''
-        Function executing steady actions.
+        Function executing steady actions with the input of the tick.
         '''
+        self.mouse_pos = inputs.mouse_pos
         if self.game is None:
+            self.bird.savePosition()
             self.bird.gravity()
             self.bird.move()
-            self.checkButtonsClick()
+            self.checkButtonsClick(inputs)
             self.checkBirdCollisions()
         else:
-            self.game.actions()
+            self.game.actions(inputs)
             self.checkGameOver()
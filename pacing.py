@@ -0,0 +1,173 @@
+import json
+import time
+import pygame
+from profiler import percentile
+from timestep import TICK_RATE, MAX_TICKS_PER_FRAME
+
+IDLE_FPS = TICK_RATE // MAX_TICKS_PER_FRAME
+PACING_FRAMES = 600
+JITTER_FRAMES = 120
+JITTER_LIMIT = 1.0
+MAX_SPIN_MARGIN = 4.0
+LATE_FRAME = 1.5
+PACING_FILE = 'pacing.json'
+
+
+class FramePacer:
+    '''
+    Class waiting for the start of every frame.
+    The rate drops to IDLE_FPS when the window is unfocused or minimized,
+    which is still enough to keep the simulation in real time.
+    Frames are scheduled on a fixed grid of deadlines. The pacer sleeps
+    until the deadline, and if the system oversleeps too much, it sleeps
+    a bit less and waits for the rest of the time in a busy loop.
+    Busy waiting is used only for a focused window drawn faster than
+    IDLE_FPS, idle frames always sleep to save the battery.
+    With vsync the present itself waits for the display, so the pacer
+    never busy waits and only keeps the rate from going above fps
+    when the driver does not really wait.
+    '''
+    def __init__(self, vsync=False):
+        '''
+        Function initializing the pacer.
+        '''
+        self.vsync = vsync
+        self.focused = True
+        self.minimized = False
+        self.busy = False
+        self.margin = 0.0
+        self.jitter = 0.0
+        self.oversleeps = []
+        self.intervals = [0.0] * PACING_FRAMES
+        self.index = 0
+        self.count = 0
+        self.frames = 0
+        self.late_frames = 0
+        self.waited = 0.0
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.deadline = self.started
+
+    def handleEvent(self, event):
+        '''
+        Function following focus and visibility of the window.
+        '''
+        if event.type == pygame.WINDOWFOCUSLOST:
+            self.focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.focused = True
+        elif event.type in (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN):
+            self.minimized = True
+        elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWSHOWN):
+            self.minimized = False
+
+    def frameRate(self, fps):
+        '''
+        Function returning rate of frames used for the wanted rate.
+        '''
+        if self.minimized or not self.focused:
+            return min(fps, IDLE_FPS)
+        return fps
+
+    def sleepUntil(self, target, spin=True):
+        '''
+        Function sleeping until the target time. In the busy mode
+        it wakes up earlier and spins for the rest of the time,
+        unless spin is False.
+        '''
+        busy = self.busy and spin and not self.vsync
+        wake = target - self.margin if busy else target
+        delay = wake - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+            self.measureOversleep(time.perf_counter() - wake)
+        if busy:
+            while time.perf_counter() < target:
+                pass
+
+    def measureOversleep(self, oversleep):
+        '''
+        Function saving how much later than asked the pacer woke up
+        and choosing between sleeping and busy waiting
+        after every JITTER_FRAMES measurements.
+        '''
+        self.oversleeps.append(oversleep * 1000)
+        if len(self.oversleeps) >= JITTER_FRAMES:
+            jitter = percentile(sorted(self.oversleeps), 0.95)
+            self.busy = jitter > JITTER_LIMIT
+            self.margin = min(jitter, MAX_SPIN_MARGIN) / 1000
+            self.jitter = jitter
+            self.oversleeps = []
+
+    def wait(self, fps):
+        '''
+        Function waiting for the next frame drawn at the wanted rate
+        and returning milliseconds since the previous frame.
+        '''
+        rate = self.frameRate(fps)
+        frame_time = 1 / rate
+        start = time.perf_counter()
+        target = self.deadline + frame_time
+        if target < start - frame_time:
+            target = start
+        self.sleepUntil(target, self.focused and not self.minimized and
+                        rate > IDLE_FPS)
+        now = time.perf_counter()
+        self.waited += now - start
+        elapsed = now - self.last
+        self.last = now
+        self.deadline = target
+        self.saveInterval(elapsed, frame_time)
+        return elapsed * 1000
+
+    def saveInterval(self, elapsed, frame_time):
+        '''
+        Function saving the time between two frames.
+        '''
+        self.intervals[self.index] = elapsed * 1000
+        self.index = (self.index + 1) % PACING_FRAMES
+        if self.count < PACING_FRAMES:
+            self.count += 1
+        self.frames += 1
+        if elapsed > frame_time * LATE_FRAME:
+            self.late_frames += 1
+
+    def currentFps(self):
+        '''
+        Function returning rate of recent frames.
+        '''
+        if self.count == 0:
+            return 0.0
+        return 1000 * self.count / sum(self.intervals[:self.count])
+
+    def mode(self):
+        '''
+        Function returning name of the current way of waiting.
+        '''
+        if self.vsync:
+            return 'vsync'
+        return 'busy' if self.busy else 'sleep'
+
+    def stats(self):
+        '''
+        Function returning achieved pacing as a dictionary.
+        '''
+        total = time.perf_counter() - self.started
+        intervals = sorted(self.intervals[:self.count])
+        return {'mode': self.mode(),
+                'frames': self.frames,
+                'mean_fps': round(self.frames / total, 1),
+                'recent_fps': round(self.currentFps(), 1),
+                'interval_p50_ms': round(percentile(intervals, 0.5), 2),
+                'interval_p95_ms': round(percentile(intervals, 0.95), 2),
+                'interval_p99_ms': round(percentile(intervals, 0.99), 2),
+                'late_frames': self.late_frames,
+                'oversleep_p95_ms': round(self.jitter, 2),
+                'waiting_share': round(self.waited / total, 3)}
+
+    def writeStats(self, path=PACING_FILE):
+        '''
+        Function writing achieved pacing to the JSON file.
+        '''
+        with open(path, 'w') as file:
+            json.dump(self.stats(), file, indent=2)
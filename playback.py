@@ -0,0 +1,86 @@
+import os
+import sys
+import bisect
+import argparse
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from engines import ENGINES
+from replay import Replay, ReplayError
+
+
+class Playback:
+    '''
+    Class playing recorded games without a window at unlimited speed.
+    '''
+    def __init__(self, replay):
+        '''
+        Function initializing the playback of the replay.
+        '''
+        self.replay = replay
+        self.engine_class = ENGINES[replay.game]
+        self.keyframe_ticks = [tick for tick, snapshot in replay.keyframes]
+        self.engine = self.engine_class(seed=replay.seed)
+
+    def seek(self, tick):
+        '''
+        Function moving the playback to the given tick.
+        It starts from the nearest keyframe before the tick.
+        '''
+        i = bisect.bisect_right(self.keyframe_ticks, tick) - 1
+        if i >= 0:
+            start, snapshot = self.replay.keyframes[i]
+            self.engine = self.engine_class(seed=self.replay.seed)
+            self.engine.setSnapshot(snapshot)
+        elif tick < self.engine.ticks:
+            self.engine = self.engine_class(seed=self.replay.seed)
+        for action in self.replay.actions(self.engine.ticks):
+            if self.engine.ticks >= tick or self.engine.gameover:
+                break
+            self.engine.step(action)
+        return self.engine
+
+    def playToEnd(self):
+        '''
+        Function playing the replay to its last tick.
+        '''
+        return self.seek(self.replay.ticks)
+
+    def verify(self):
+        '''
+        Function checking if playing the inputs gives
+        the recorded score and length of the game.
+        '''
+        engine = self.playToEnd()
+        return (engine.score == self.replay.score and
+                engine.ticks == self.replay.ticks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play recorded games.")
+    parser.add_argument('path')
+    parser.add_argument('--tick', type=int, default=None,
+                        help="show state at this tick instead of the end")
+    args = parser.parse_args()
+
+    try:
+        playback = Playback(Replay.load(args.path))
+    except (OSError, ReplayError) as error:
+        print("cannot read replay: " + str(error), file=sys.stderr)
+        sys.exit(2)
+    if args.tick is not None:
+        print(playback.seek(args.tick).getState())
+        return
+    valid = playback.verify()
+    replay = playback.replay
+    print(replay.game + " seed " + str(replay.seed) + ": score " +
+          str(replay.score) + " in " + str(replay.ticks) + " ticks, " +
+          ("verified" if valid else "NOT REPRODUCED (got score " +
+           str(playback.engine.score) + " in " +
+           str(playback.engine.ticks) + " ticks)"))
+    if not valid:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+class RingBuffer:
+    '''
+    Class defining a queue of recycled objects stored in a ring buffer.
+    Objects are created by the factory only when the buffer grows,
+    new items are taken from the end and old ones are released
+    from the front, so steady-state use allocates nothing.
+    '''
+    __slots__ = ('factory', 'items', 'start', 'length')
+
+    def __init__(self, factory, capacity):
+        '''
+        Function initializing the buffer with capacity objects.
+        '''
+        self.factory = factory
+        self.items = [factory() for i in range(capacity)]
+        self.start = 0
+        self.length = 0
+
+    def __len__(self):
+        '''
+        Function returning number of items in use.
+        '''
+        return self.length
+
+    def __getitem__(self, index):
+        '''
+        Function returning item at the index counted from the front.
+        '''
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('ring buffer index out of range')
+        return self.items[(self.start + index) % len(self.items)]
+
+    def __iter__(self):
+        '''
+        Function iterating over items from the front to the end.
+        '''
+        capacity = len(self.items)
+        for i in range(self.length):
+            yield self.items[(self.start + i) % capacity]
+
+    def grow(self):
+        '''
+        Function doubling capacity of the buffer,
+        keeping items in use in the same order.
+        '''
+        capacity = len(self.items)
+        items = self.items[self.start:] + self.items[:self.start]
+        items.extend(self.factory() for i in range(max(capacity, 1)))
+        self.items = items
+        self.start = 0
+
+    def push(self):
+        '''
+        Function returning a recycled object appended to the end.
+        The object keeps its old attributes, so it has to be reset.
+        '''
+        if self.length == len(self.items):
+            self.grow()
+        item = self.items[(self.start + self.length) % len(self.items)]
+        self.length += 1
+        return item
+
+    def popleft(self):
+        '''
+        Function releasing the first item, which will be reused later.
+        '''
+        if self.length == 0:
+            raise IndexError('pop from an empty ring buffer')
+        item = self.items[self.start]
+        self.start = (self.start + 1) % len(self.items)
+        self.length -= 1
+        return item
+
+    def clear(self):
+        '''
+        Function releasing every item.
+        '''
+        self.start = 0
+        self.length = 0
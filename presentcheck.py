@@ -0,0 +1,101 @@
+import os
+import sys
+import random
+import argparse
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from renderer import Renderer
+
+LOGICAL_SIZE = (800, 600)
+CASES = (((400, 300), 0.5), ((600, 450), 0.75), ((800, 600), 1.0),
+         ((1000, 750), 0.75), ((1000, 750), 0.5))
+SPRITES = 6
+SPRITE_SIZE = 50
+FRAMES = 300
+
+
+def parseSize(text):
+    '''
+    Function changing text like 400x300 to a (width, height) tuple.
+    '''
+    width, height = text.lower().split('x')
+    return (int(width), int(height))
+
+
+def uncoveredPixels(before, after, rects):
+    '''
+    Function returning number of pixels of the window which changed
+    between the two copies but are outside of the presented rects.
+    '''
+    changed = (before != after).any(axis=2)
+    for rect in rects:
+        changed[rect.left:rect.right, rect.top:rect.bottom] = False
+    return int(changed.sum())
+
+
+def checkPresent(window, scale, frames=FRAMES, seed=0):
+    '''
+    Function moving sprites around the window drawn with the scale
+    and returning number of changed pixels which were not presented.
+    The first sprite moves from (700, 500) to the corner of the window,
+    so it also covers areas which exist only in the logical size.
+    '''
+    display = pygame.display.set_mode(window)
+    renderer = Renderer(display, LOGICAL_SIZE)
+    renderer.setScale(scale)
+    rng = random.Random(seed)
+    sprites = []
+    for i in range(SPRITES):
+        sprite = pygame.Surface((SPRITE_SIZE, SPRITE_SIZE)).convert(display)
+        sprite.fill((rng.randrange(256), rng.randrange(256),
+                     rng.randrange(256)))
+        sprites.append(sprite)
+    positions = [(700, 500)] + [(rng.randrange(LOGICAL_SIZE[0]),
+                                 rng.randrange(LOGICAL_SIZE[1]))
+                                for i in range(SPRITES - 1)]
+    uncovered = 0
+    for frame in range(frames):
+        renderer.fill((30, 30, 30))
+        renderer.blits(zip(sprites, positions))
+        before = pygame.surfarray.array3d(display)
+        rects = renderer.render()
+        uncovered += uncoveredPixels(before,
+                                     pygame.surfarray.array3d(display),
+                                     rects)
+        positions = [(x + rng.randint(-3, 10), y + rng.randint(-3, 3))
+                     for x, y in positions]
+        positions = [(x % LOGICAL_SIZE[0], y % LOGICAL_SIZE[1])
+                     for x, y in positions]
+    return uncovered
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that the renderer presents every changed pixel.")
+    parser.add_argument('--window', type=parseSize, default=None)
+    parser.add_argument('--scale', type=float, default=None)
+    parser.add_argument('--frames', type=int, default=FRAMES)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cases = CASES
+    if args.window is not None or args.scale is not None:
+        cases = ((args.window or LOGICAL_SIZE,
+                  1.0 if args.scale is None else args.scale),)
+    pygame.init()
+    failed = False
+    for window, scale in cases:
+        uncovered = checkPresent(window, scale, args.frames, args.seed)
+        print('%4dx%-4d scale %.2f  %d pixels not presented'
+              % (window[0], window[1], scale, uncovered))
+        failed = failed or uncovered > 0
+    pygame.quit()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
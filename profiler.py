@@ -0,0 +1,216 @@
+import time
+import pygame
+import fonts
+
+WHITE = (255, 255, 255)
+OVERLAY_COLOR = (0, 0, 0, 160)
+
+PHASES = ('events', 'actions', 'draw', 'present')
+EVENTS = 0
+ACTIONS = 1
+DRAW = 2
+PRESENT = 3
+
+PROFILE_FRAMES = 1200
+PROFILE_FILE = 'profile.txt'
+OVERLAY_KEY = pygame.K_F3
+OVERLAY_INTERVAL = 30
+OVERLAY_POSITION = (10, 10)
+OVERLAY_FONT_SIZE = 20
+OVERLAY_PADDING = 6
+
+
+def percentile(values, fraction):
+    '''
+    Function returning the value below which the given fraction
+    of sorted values lies.
+    '''
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class FrameHistory:
+    '''
+    Class keeping times of the last frames of one game in a ring buffer.
+    Times are in milliseconds, totals cover every recorded frame.
+    '''
+    def __init__(self, size):
+        '''
+        Function initializing the history.
+        '''
+        self.frames = [0.0] * size
+        self.phases = [[0.0] * size for phase in PHASES]
+        self.index = 0
+        self.count = 0
+        self.total = 0
+        self.frame_total = 0.0
+        self.phase_totals = [0.0] * len(PHASES)
+        self.phase_maxima = [0.0] * len(PHASES)
+
+    def add(self, frame, phases):
+        '''
+        Function adding time of the frame and times of its phases.
+        '''
+        i = self.index
+        self.frames[i] = frame
+        self.frame_total += frame
+        for phase, duration in enumerate(phases):
+            self.phases[phase][i] = duration
+            self.phase_totals[phase] += duration
+            if duration > self.phase_maxima[phase]:
+                self.phase_maxima[phase] = duration
+        self.index = (i + 1) % len(self.frames)
+        if self.count < len(self.frames):
+            self.count += 1
+        self.total += 1
+
+    def percentiles(self):
+        '''
+        Function returning p50, p95 and p99 of recent frame times.
+        '''
+        frames = sorted(self.frames[:self.count])
+        return (percentile(frames, 0.5), percentile(frames, 0.95),
+                percentile(frames, 0.99))
+
+    def phaseMeans(self):
+        '''
+        Function returning mean times of phases in recent frames.
+        '''
+        if self.count == 0:
+            return [0.0] * len(PHASES)
+        return [sum(times[:self.count]) / self.count
+                for times in self.phases]
+
+    def slowestPhase(self):
+        '''
+        Function returning name and mean time of the phase
+        taking the most time in recent frames.
+        '''
+        means = self.phaseMeans()
+        phase = means.index(max(means))
+        return PHASES[phase], means[phase]
+
+
+class FrameProfiler:
+    '''
+    Class measuring how long every phase of a frame takes.
+    The main loop calls startFrame, mark after every phase
+    and endFrame, times are kept separately for every active game.
+    '''
+    def __init__(self, size=PROFILE_FRAMES):
+        '''
+        Function initializing the profiler.
+        '''
+        self.size = size
+        self.histories = {}
+        self.times = [0.0] * len(PHASES)
+        self.last = time.perf_counter()
+        self.name = None
+        self.overlay = False
+        self.overlay_surface = None
+        self.overlay_countdown = 0
+
+    def startFrame(self):
+        '''
+        Function starting measurement of a frame.
+        '''
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        '''
+        Function saving time of the phase which has just ended.
+        '''
+        now = time.perf_counter()
+        self.times[phase] = (now - self.last) * 1000
+        self.last = now
+
+    def endFrame(self, name, elapsed):
+        '''
+        Function saving the frame of the given game,
+        elapsed is the time since the previous frame in milliseconds.
+        '''
+        history = self.histories.get(name)
+        if history is None:
+            history = FrameHistory(self.size)
+            self.histories[name] = history
+        history.add(elapsed, self.times)
+        self.name = name
+
+    def toggleOverlay(self):
+        '''
+        Function showing or hiding the overlay.
+        '''
+        self.overlay = not self.overlay
+        self.overlay_countdown = 0
+
+    def overlayLines(self, fps):
+        '''
+        Function returning lines of text shown on the overlay.
+        '''
+        history = self.histories.get(self.name)
+        if history is None:
+            return ['FPS %.1f' % fps]
+        p50, p95, p99 = history.percentiles()
+        phase, duration = history.slowestPhase()
+        return ['%s  FPS %.1f' % (self.name, fps),
+                'frame p50 %.1f  p95 %.1f  p99 %.1f ms' % (p50, p95, p99),
+                'slowest %s %.2f ms' % (phase, duration)]
+
+    def createOverlay(self, fps):
+        '''
+        Function rendering the overlay on a translucent panel.
+        '''
+        font = fonts.getFont(OVERLAY_FONT_SIZE)
+        texts = [font.render(line, True, WHITE)
+                 for line in self.overlayLines(fps)]
+        width = max(text.get_width() for text in texts)
+        height = sum(text.get_height() for text in texts)
+        self.overlay_surface = pygame.Surface(
+            (width + 2*OVERLAY_PADDING, height + 2*OVERLAY_PADDING),
+            pygame.SRCALPHA)
+        self.overlay_surface.fill(OVERLAY_COLOR)
+        y = OVERLAY_PADDING
+        for text in texts:
+            self.overlay_surface.blit(text, (OVERLAY_PADDING, y))
+            y += text.get_height()
+
+    def drawOverlay(self, screen, fps):
+        '''
+        Function drawing the overlay,
+        its text is updated every OVERLAY_INTERVAL frames.
+        '''
+        if self.overlay_countdown <= 0:
+            self.createOverlay(fps)
+            self.overlay_countdown = OVERLAY_INTERVAL
+        self.overlay_countdown -= 1
+        screen.blit(self.overlay_surface, OVERLAY_POSITION)
+
+    def summary(self):
+        '''
+        Function returning summary of every game as lines of text.
+        '''
+        lines = []
+        for name, history in self.histories.items():
+            p50, p95, p99 = history.percentiles()
+            phase, duration = history.slowestPhase()
+            lines.append('[%s]' % name)
+            lines.append('frames %d' % history.total)
+            lines.append('mean frame %.2f ms'
+                         % (history.frame_total / history.total))
+            lines.append('recent frame p50 %.2f p95 %.2f p99 %.2f ms'
+                         % (p50, p95, p99))
+            for i, phase_name in enumerate(PHASES):
+                mean = history.phase_totals[i] / history.total
+                lines.append('%s mean %.3f max %.3f ms'
+                             % (phase_name, mean, history.phase_maxima[i]))
+            lines.append('slowest %s %.3f ms' % (phase, duration))
+            lines.append('')
+        return lines
+
+    def writeSummary(self, path=PROFILE_FILE):
+        '''
+        Function writing summary of every game to the file.
+        '''
+        with open(path, 'w') as file:
+            file.write('\n'.join(self.summary()))
@@ -0,0 +1,355 @@
+import math
+import weakref
+import pygame
+
+MAX_DIRTY_RECTS = 16
+MAX_DIRTY_AREA = 0.5
+
+SCALE_LEVELS = (1.0, 0.75, 0.5)
+SCALE_FRAMES = 60
+SCALE_DOWN_LOAD = 0.9
+SCALE_UP_LOAD = 0.5
+
+BLIT = 0
+FILL = 1
+RECT = 2
+
+
+def mergeRects(rects):
+    '''
+    Function joining overlapping rectangles, so no area is drawn twice.
+    '''
+    merged = []
+    for rect in rects:
+        rect = pygame.rect.Rect(rect)
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class Renderer:
+    '''
+    Class drawing frames on the window and presenting only changed parts.
+    Games draw on it like on the screen surface of the logical size,
+    which does not depend on the size of the window. Drawing calls are
+    recorded during the frame and compared with calls of the previous
+    frame, only areas of calls which differ are drawn again.
+    When the window has the logical size and the scale is 1, frames are
+    drawn directly on the window and only changed areas are sent to the
+    display with pygame.display.update. Otherwise they are drawn on
+    a canvas of the logical size multiplied by the scale,
+    which is scaled to the window once per changed frame.
+    '''
+    def __init__(self, display, size=None):
+        '''
+        Function initializing the renderer.
+        '''
+        self.display = display
+        self.window = pygame.rect.Rect((0, 0), size or display.get_size())
+        self.commands = []
+        self.previous = []
+        self.setScale(1.0)
+
+    def get_rect(self):
+        '''
+        Function returning logical rectangle of the window.
+        '''
+        return self.window.copy()
+
+    def setScale(self, scale):
+        '''
+        Function changing resolution of the canvas to the logical size
+        multiplied by the scale. The next frame is drawn whole.
+        '''
+        self.scale = scale
+        size = (round(self.window.width * scale),
+                round(self.window.height * scale))
+        if scale == 1 and size == self.display.get_size():
+            self.screen = self.display
+        else:
+            self.screen = pygame.Surface(size).convert(self.display)
+        self.scaled = weakref.WeakKeyDictionary()
+        self.invalid = [self.window.copy()]
+
+    def scaleRect(self, rect):
+        '''
+        Function returning area of the canvas covering the logical rect.
+        '''
+        if self.scale == 1:
+            return rect
+        left = math.floor(rect[0] * self.scale)
+        top = math.floor(rect[1] * self.scale)
+        return pygame.rect.Rect(
+            left, top,
+            math.ceil((rect[0] + rect[2]) * self.scale) - left,
+            math.ceil((rect[1] + rect[3]) * self.scale) - top)
+
+    def scaleSurface(self, surface):
+        '''
+        Function returning the surface scaled to the canvas.
+        Scaled surfaces are kept until the original one is removed
+        or some area is invalidated.
+        '''
+        if self.scale == 1:
+            return surface
+        scaled = self.scaled.get(surface)
+        if scaled is None:
+            width, height = surface.get_size()
+            scaled = pygame.transform.scale(
+                surface, (max(1, round(width * self.scale)),
+                          max(1, round(height * self.scale))))
+            self.scaled[surface] = scaled
+        return scaled
+
+    def toLogical(self, position):
+        '''
+        Function changing position in the window to the logical position.
+        '''
+        width, height = self.display.get_size()
+        return (position[0] * self.window.width // width,
+                position[1] * self.window.height // height)
+
+    def blit(self, surface, position):
+        '''
+        Function drawing surface at the given position.
+        Surfaces outside of the window are not drawn at all.
+        '''
+        rect = surface.get_rect(topleft=position)
+        if rect.colliderect(self.window):
+            self.commands.append(((BLIT, surface, rect.x, rect.y), rect))
+
+    def blits(self, sequence):
+        '''
+        Function drawing a layer of (surface, position) pairs,
+        like Surface.blits. Surfaces outside of the window are skipped,
+        the rest is drawn with one Surface.blits call.
+        '''
+        window = self.window
+        commands = self.commands
+        for surface, position in sequence:
+            rect = surface.get_rect(topleft=position)
+            if rect.colliderect(window):
+                commands.append(((BLIT, surface, rect.x, rect.y), rect))
+
+    def fill(self, color, rect=None):
+        '''
+        Function filling the rectangle or the whole window with color.
+        '''
+        rect = self.window.copy() if rect is None else pygame.rect.Rect(rect)
+        self.commands.append(((FILL, tuple(color), tuple(rect)), rect))
+
+    def drawRect(self, color, rect, border_radius=0):
+        '''
+        Function drawing filled rectangle.
+        '''
+        rect = pygame.rect.Rect(rect)
+        self.commands.append(((RECT, tuple(color), tuple(rect),
+                               border_radius), rect))
+
+    def invalidate(self, rect=None):
+        '''
+        Function forcing area of the window to be drawn again
+        in the next frame, for example when a drawn surface was changed.
+        The changed surface may be scaled, so scaled surfaces are dropped.
+        '''
+        self.invalid.append(self.window.copy() if rect is None
+                            else pygame.rect.Rect(rect))
+        if self.scaled:
+            self.scaled.clear()
+
+    def findDirtyRects(self):
+        '''
+        Function returning areas changed since the previous frame.
+        '''
+        current = set(key for key, rect in self.commands)
+        previous = set(key for key, rect in self.previous)
+        dirty = list(self.invalid)
+        dirty += [rect for key, rect in self.commands if key not in previous]
+        dirty += [rect for key, rect in self.previous if key not in current]
+        dirty = [rect.clip(self.window) for rect in dirty]
+        dirty = mergeRects(rect for rect in dirty
+                           if rect.width and rect.height)
+        area = sum(rect.width * rect.height for rect in dirty)
+        window_area = self.window.width * self.window.height
+        if len(dirty) > MAX_DIRTY_RECTS or area > window_area * MAX_DIRTY_AREA:
+            return [self.window.copy()]
+        return dirty
+
+    def execute(self, commands):
+        '''
+        Function executing recorded drawing calls in order.
+        Blits following each other form one layer,
+        which is drawn with a single Surface.blits call.
+        '''
+        layer = []
+        for command in commands:
+            key = command[0]
+            if key[0] == BLIT:
+                if self.scale == 1:
+                    layer.append((key[1], (key[2], key[3])))
+                else:
+                    layer.append((self.scaleSurface(key[1]),
+                                  (round(key[2] * self.scale),
+                                   round(key[3] * self.scale))))
+                continue
+            if layer:
+                self.screen.blits(layer, False)
+                layer = []
+            if key[0] == FILL:
+                self.screen.fill(key[1], self.scaleRect(key[2]))
+            else:
+                pygame.draw.rect(self.screen, key[1], self.scaleRect(key[2]),
+                                 border_radius=round(key[3] * self.scale))
+        if layer:
+            self.screen.blits(layer, False)
+
+    def alignRect(self, rect):
+        '''
+        Function returning the area of the canvas enlarged to whole
+        blocks of the scaling and the area of the window showing it.
+        A block of the canvas is always scaled to the same block of the
+        window, so scaling the areas alone gives the same pixels
+        as scaling the whole canvas.
+        '''
+        canvas = self.screen.get_size()
+        window = self.display.get_size()
+        source = []
+        target = []
+        for axis in (0, 1):
+            divisor = math.gcd(canvas[axis], window[axis])
+            step = canvas[axis] // divisor
+            start = rect[axis] // step * step
+            end = min(-(-(rect[axis] + rect[axis + 2]) // step) * step,
+                      canvas[axis])
+            source.append((start, end - start))
+            target.append((start * window[axis] // canvas[axis],
+                           (end - start) * window[axis] // canvas[axis]))
+        return (pygame.rect.Rect(source[0][0], source[1][0],
+                                 source[0][1], source[1][1]),
+                pygame.rect.Rect(target[0][0], target[1][0],
+                                 target[0][1], target[1][1]))
+
+    def scaleToDisplay(self, areas):
+        '''
+        Function scaling changed areas of the canvas to the window
+        and returning the changed areas of the window.
+        When they are too big, the whole canvas is scaled at once.
+        '''
+        blocks = [self.alignRect(area) for area in areas]
+        width, height = self.display.get_size()
+        area = sum(target.width * target.height for source, target in blocks)
+        if area > width * height * MAX_DIRTY_AREA:
+            pygame.transform.scale(self.screen, (width, height), self.display)
+            return [self.display.get_rect()]
+        for source, target in blocks:
+            if source.width and source.height:
+                pygame.transform.scale(self.screen.subsurface(source),
+                                       target.size,
+                                       self.display.subsurface(target))
+        return [target for source, target in blocks]
+
+    def render(self):
+        '''
+        Function drawing changed areas of the frame on the window
+        without sending them to the display. Returns the changed areas
+        of the window, which are passed to show.
+        Rounding of scaled positions can move a surface by a pixel
+        of the canvas, so with scale other than 1 the areas are padded
+        and everything near them is drawn again.
+        '''
+        dirty = self.findDirtyRects()
+        pad = 0 if self.scale == 1 else math.ceil(2 / self.scale)
+        rects = [command[1] for command in self.commands]
+        areas = []
+        for area in dirty:
+            if pad:
+                area = area.inflate(2 * pad, 2 * pad)
+            clip = self.scaleRect(area).clip(self.screen.get_rect())
+            areas.append(clip)
+            self.screen.set_clip(clip)
+            if pad:
+                area = area.inflate(2 * pad, 2 * pad)
+            self.execute([self.commands[i]
+                          for i in area.collidelistall(rects)])
+        self.screen.set_clip(None)
+        self.previous = self.commands
+        self.commands = []
+        self.invalid = []
+        if self.screen is self.display or not areas:
+            return dirty
+        return self.scaleToDisplay(areas)
+
+    def show(self, dirty):
+        '''
+        Function sending changed areas of the window to the display.
+        With vsync it waits for the display.
+        '''
+        if dirty:
+            pygame.display.update(dirty)
+
+    def present(self):
+        '''
+        Function drawing changed areas of the frame and
+        sending them to the display. Returns the changed areas.
+        '''
+        dirty = self.render()
+        self.show(dirty)
+        return dirty
+
+
+class ResolutionScaler:
+    '''
+    Class changing scale of the renderer according to the time
+    of drawing frames. When drawing takes most of the time of a frame,
+    the scale drops to the next level of SCALE_LEVELS, when it takes
+    less than half of it, the scale rises back.
+    If a lower level does not make drawing faster, the scale returns
+    to the previous level and never drops below it again.
+    '''
+    def __init__(self, renderer, levels=SCALE_LEVELS):
+        '''
+        Function initializing the scaler.
+        '''
+        self.renderer = renderer
+        self.levels = levels
+        self.level = 0
+        self.lowest = len(levels) - 1
+        self.previous_time = None
+        self.load = 0.0
+        self.time = 0.0
+        self.frames = 0
+        self.renderer.setScale(self.levels[self.level])
+
+    def update(self, draw_time, fps):
+        '''
+        Function adding time of drawing a frame in milliseconds
+        for the current rate of frames. Waiting for the display
+        must not be included. The scale is chosen again after
+        every SCALE_FRAMES frames.
+        '''
+        self.load += draw_time * fps / 1000
+        self.time += draw_time
+        self.frames += 1
+        if self.frames < SCALE_FRAMES:
+            return
+        load = self.load / self.frames
+        draw_time = self.time / self.frames
+        self.load = 0.0
+        self.time = 0.0
+        self.frames = 0
+        previous_time = self.previous_time
+        self.previous_time = None
+        if previous_time is not None and draw_time >= previous_time:
+            self.level -= 1
+            self.lowest = self.level
+        elif load > SCALE_DOWN_LOAD and self.level < self.lowest:
+            self.level += 1
+            self.previous_time = draw_time
+        elif load < SCALE_UP_LOAD and self.level > 0:
+            self.level -= 1
+        else:
+            return
+        self.renderer.setScale(self.levels[self.level])
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import zlib
+import struct
+import threading
+
+REPLAYS_DIR = 'replays'
+REPLAY_EXTENSION = '.bgr'
+REPLAY_MAGIC = b'BGRP'
+REPLAY_VERSION = 2
+KEYFRAME_INTERVAL = 1200
+REPLAYS_KEPT = 50
+
+HEADER = struct.Struct('<4sBB')
+INFO = struct.Struct('<QII')
+ACTION = struct.Struct('<b')
+
+
+class ReplayError(Exception):
+    '''
+    Exception raised when a replay file cannot be read.
+    '''
+
+
+def writeVarint(buffer, value):
+    '''
+    Function appending unsigned integer to the buffer using
+    7 bits per byte.
+    '''
+    while value >= 0x80:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def removeOldReplays(directory=REPLAYS_DIR, kept=REPLAYS_KEPT):
+    '''
+    Function removing the oldest replays of the directory,
+    so at most kept replays remain.
+    '''
+    try:
+        paths = [os.path.join(directory, name)
+                 for name in os.listdir(directory)
+                 if name.endswith(REPLAY_EXTENSION)]
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:-kept] if kept > 0 else paths:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def readVarint(data, position):
+    '''
+    Function reading unsigned integer written by writeVarint.
+    Returns the value and the position after it.
+    '''
+    value = 0
+    shift = 0
+    while True:
+        if position >= len(data):
+            raise ReplayError("unexpected end of replay")
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class Replay:
+    '''
+    Class holding a recorded game: the engine seed, inputs of every tick
+    stored as runs of the same action and keyframes with engine snapshots.
+    '''
+    def __init__(self, game, seed, runs, score=0, ticks=0, keyframes=None):
+        '''
+        Function initializing the replay.
+        runs is a list of [action, number of ticks].
+        keyframes is a list of (tick, snapshot).
+        '''
+        self.game = game
+        self.seed = seed
+        self.runs = runs
+        self.score = score
+        self.ticks = ticks
+        self.keyframes = keyframes or []
+
+    def actions(self, start=0):
+        '''
+        Generator returning actions of ticks from start to the end.
+        '''
+        tick = 0
+        for action, count in self.runs:
+            if tick + count > start:
+                for i in range(max(start - tick, 0), count):
+                    yield action
+            tick += count
+
+    def toBytes(self):
+        '''
+        Function encoding the replay in the binary format.
+        '''
+        game = self.game.encode('ascii')
+        buffer = bytearray(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION,
+                                       len(game)))
+        buffer += game
+        buffer += INFO.pack(self.seed, self.ticks, self.score)
+        writeVarint(buffer, len(self.runs))
+        for action, count in self.runs:
+            buffer += ACTION.pack(action)
+            writeVarint(buffer, count)
+        writeVarint(buffer, len(self.keyframes))
+        for tick, snapshot in self.keyframes:
+            data = zlib.compress(json.dumps(snapshot,
+                                            separators=(',', ':')).encode())
+            writeVarint(buffer, tick)
+            writeVarint(buffer, len(data))
+            buffer += data
+        return bytes(buffer)
+
+    @staticmethod
+    def fromBytes(data):
+        '''
+        Function decoding replay from the binary format.
+        '''
+        if len(data) < HEADER.size:
+            raise ReplayError("replay is too short")
+        magic, version, length = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ReplayError("not a replay file")
+        if version != REPLAY_VERSION:
+            raise ReplayError("unsupported replay version " + str(version))
+        position = HEADER.size
+        game = data[position:position + length].decode('ascii')
+        position += length
+        seed, ticks, score = INFO.unpack_from(data, position)
+        position += INFO.size
+        runs = []
+        count, position = readVarint(data, position)
+        for i in range(count):
+            action = ACTION.unpack_from(data, position)[0]
+            run, position = readVarint(data, position + ACTION.size)
+            runs.append([action, run])
+        keyframes = []
+        count, position = readVarint(data, position)
+        for i in range(count):
+            tick, position = readVarint(data, position)
+            length, position = readVarint(data, position)
+            snapshot = json.loads(zlib.decompress(
+                data[position:position + length]))
+            keyframes.append((tick, snapshot))
+            position += length
+        return Replay(game, seed, runs, score, ticks, keyframes)
+
+    def save(self, path):
+        '''
+        Function writing the replay to a temporary file and
+        renaming it, so a half written replay never appears.
+        '''
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(self.toBytes())
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def load(path):
+        '''
+        Function reading replay from the file.
+        '''
+        with open(path, 'rb') as file:
+            return Replay.fromBytes(file.read())
+
+
+class Recorder:
+    '''
+    Class recording actions of a game played on the screen.
+    Keyframes are taken from the played game itself, so saving
+    the replay does not need to play the game again.
+    '''
+    def __init__(self, game, seed, interval=KEYFRAME_INTERVAL):
+        '''
+        Function initializing the recorder.
+        '''
+        self.game = game
+        self.seed = seed
+        self.interval = interval
+        self.runs = []
+        self.keyframes = []
+
+    def record(self, action, engine):
+        '''
+        Function recording action of one tick, which is going
+        to be simulated by the engine.
+        '''
+        if engine.ticks % self.interval == 0:
+            self.keyframes.append((engine.ticks, engine.getSnapshot()))
+        if self.runs and self.runs[-1][0] == action:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([action, 1])
+
+    def path(self):
+        '''
+        Function returning path of the replay file.
+        '''
+        name = (self.game + '-' + time.strftime('%Y%m%d-%H%M%S') + '-' +
+                str(self.seed) + REPLAY_EXTENSION)
+        return os.path.join(REPLAYS_DIR, name)
+
+    def save(self, score, ticks):
+        '''
+        Function saving the replay in a background thread.
+        '''
+        replay = Replay(self.game, self.seed, [list(run) for run in self.runs],
+                        score, ticks, list(self.keyframes))
+        thread = threading.Thread(target=self.write, args=(replay,))
+        thread.start()
+        return thread
+
+    def write(self, replay):
+        '''
+        Function writing the replay and removing the oldest ones
+        above REPLAYS_KEPT.
+        '''
+        try:
+            replay.save(self.path())
+        except OSError:
+            return
+        removeOldReplays()
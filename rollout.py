@@ -0,0 +1,207 @@
+import os
+import sys
+import random
+import argparse
+import multiprocessing
+from collections import namedtuple
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from engines import ENGINES
+import flappybird
+import skybird
+import spikes
+from autopilot import Autopilot
+
+MAX_TICKS = 120 * 60 * 10
+
+Result = namedtuple('Result', 'game episode seed score ticks cause')
+
+
+def idlePolicy(state, rng):
+    '''
+    Policy never doing anything.
+    '''
+    return 0
+
+
+def randomJumpPolicy(state, rng):
+    '''
+    Policy jumping at random moments.
+    '''
+    return flappybird.JUMP if rng.random() < 0.05 else flappybird.NOTHING
+
+
+def randomMovePolicy(state, rng):
+    '''
+    Policy moving at random in Skybird.
+    '''
+    return rng.choice((skybird.LEFT, skybird.NOTHING, skybird.RIGHT))
+
+
+def flappyPolicy(state, rng):
+    '''
+    Policy keeping the bird at the height of the nearest gap.
+    '''
+    target = 300
+    for x, top, bottom in state['obstacles']:
+        if x + flappybird.OBSTACLE_WIDTH >= 150:
+            target = (top + bottom) / 2
+            break
+    center = state['bird_y'] + flappybird.BIRD_SIZE / 2
+    if center > target + 15 and state['velocity_y'] >= 0:
+        return flappybird.JUMP
+    return flappybird.NOTHING
+
+
+def skybirdPolicy(state, rng):
+    '''
+    Policy flying towards the next object above the bird.
+    '''
+    for number, x, y, lives in state['objects']:
+        if number == state['score'] + 1:
+            distance = (x + skybird.OBJECT_WIDTH / 2 -
+                        state['bird_x'] - skybird.BIRD_SIZE / 2)
+            if distance > 10:
+                return skybird.RIGHT
+            if distance < -10:
+                return skybird.LEFT
+            break
+    return skybird.NOTHING
+
+
+def spikesPolicy(state, rng):
+    '''
+    Policy keeping the bird around the middle of the arena.
+    '''
+    if state['bird_y'] > rng.randint(240, 340) and state['velocity_y'] > 0:
+        return spikes.JUMP
+    return spikes.NOTHING
+
+
+POLICIES = {
+    'flappy': {'idle': idlePolicy, 'random': randomJumpPolicy,
+               'heuristic': flappyPolicy},
+    'skybird': {'idle': idlePolicy, 'random': randomMovePolicy,
+                'heuristic': skybirdPolicy},
+    'spikes': {'idle': idlePolicy, 'random': randomJumpPolicy,
+               'heuristic': spikesPolicy},
+}
+
+SEARCH_PLANS = {
+    'flappy': flappybird.AUTOPILOT_PLAN,
+    'skybird': skybird.AUTOPILOT_PLAN,
+    'spikes': spikes.AUTOPILOT_PLAN,
+}
+
+
+class ScriptedPolicy:
+    '''
+    Policy repeating given list of actions, one action per tick.
+    After the end of the list it does nothing.
+    '''
+    def __init__(self, actions):
+        '''
+        Function initializing the policy.
+        '''
+        self.actions = list(actions)
+
+    def __call__(self, state, rng):
+        '''
+        Function returning action for the current tick.
+        '''
+        if state['ticks'] < len(self.actions):
+            return self.actions[state['ticks']]
+        return 0
+
+
+class SearchPolicy:
+    '''
+    Policy playing with the autopilot, which simulates the engine ahead.
+    '''
+    def __init__(self, game, engine):
+        '''
+        Function initializing the policy.
+        '''
+        self.autopilot = Autopilot(ENGINES[game], SEARCH_PLANS[game],
+                                   engine.window, True)
+        self.engine = engine
+
+    def __call__(self, state, rng):
+        '''
+        Function returning action for the current tick.
+        '''
+        return self.autopilot.nextAction(self.engine)
+
+
+def initWorker():
+    '''
+    Function preparing worker process to run games without a window.
+    '''
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+
+def runEpisode(task):
+    '''
+    Function playing one seeded game and returning its result.
+    '''
+    game, episode, seed, policy, max_ticks = task
+    rng = random.Random(seed + 1)
+    engine = ENGINES[game](seed=seed)
+    if policy == 'search':
+        policy = SearchPolicy(game, engine)
+    elif isinstance(policy, str):
+        policy = POLICIES[game][policy]
+    while not engine.gameover and engine.ticks < max_ticks:
+        engine.step(policy(engine.getState(), rng))
+    cause = engine.cause if engine.gameover else 'timeout'
+    return Result(game, episode, seed, engine.score, engine.ticks, cause)
+
+
+def runRollouts(game, episodes, policy='heuristic', seed=0, workers=None,
+                max_ticks=MAX_TICKS):
+    '''
+    Function playing many games in a pool of processes.
+    Episode i is always played with seed + i, so the results do not
+    depend on the number of workers. Results are yielded in order
+    of episodes as soon as they are ready.
+    '''
+    tasks = [(game, i, seed + i, policy, max_ticks) for i in range(episodes)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        initWorker()
+        for task in tasks:
+            yield runEpisode(task)
+        return
+    with multiprocessing.Pool(workers, initializer=initWorker) as pool:
+        chunksize = max(1, len(tasks) // (workers * 8))
+        for result in pool.imap(runEpisode, tasks, chunksize):
+            yield result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many games headlessly.")
+    parser.add_argument('game', choices=sorted(ENGINES))
+    parser.add_argument('--episodes', type=int, default=100)
+    parser.add_argument('--policy', default='heuristic',
+                        choices=['idle', 'random', 'heuristic',
+                                 'search'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-ticks', type=int, default=MAX_TICKS)
+    args = parser.parse_args()
+
+    print(','.join(Result._fields))
+    total = 0
+    for result in runRollouts(args.game, args.episodes, args.policy,
+                              args.seed, args.workers, args.max_ticks):
+        print(','.join(str(value) for value in result))
+        total += result.score
+    print("mean score: " + str(total / max(1, args.episodes)),
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import os
+import sys
+import time
+import queue
+import sqlite3
+import argparse
+import threading
+
+SCORES_DIR = 'best_scores'
+DATABASE = 'scores.db'
+GAMES = ('flappy', 'skybird', 'spikes')
+DEFAULT_PLAYER = 'player'
+BATCH_SIZE = 256
+LEADERBOARD_SIZE = 10
+RETRY_DELAY = 0.1
+MAX_RETRY_DELAY = 5.0
+CLOSE_RETRIES = 5
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    finished REAL NOT NULL,
+    player TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (game, score DESC);
+CREATE INDEX IF NOT EXISTS runs_by_player ON runs (game, player, score DESC);
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY,
+    applied REAL NOT NULL
+);
+'''
+
+_store = None
+
+
+def connect(path):
+    '''
+    Function opening the database in WAL mode, so reading
+    never waits for the thread writing runs.
+    '''
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+class ScoreStore:
+    '''
+    Class keeping history of all finished runs in a SQLite database.
+    Best scores are kept in memory, every run is written to the disk
+    by a background thread in batches, so the game loop never waits
+    for the disk.
+    '''
+    def __init__(self, path=DATABASE, player=DEFAULT_PLAYER,
+                 directory=SCORES_DIR):
+        '''
+        Function initializing the store, creating the database
+        and loading best scores of all games.
+        Best scores from text files of older versions are moved
+        to the database once.
+        '''
+        self.path = path
+        self.player = player
+        self.directory = directory
+        self.connection = connect(path)
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+        self.migrateTextScores()
+        self.best_scores = {}
+        for game in GAMES:
+            self.best_scores[game] = self.queryBest(game)
+        self.error = None
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.writeRuns, daemon=True)
+        self.thread.start()
+
+    def readScore(self, game):
+        '''
+        Function reading best score of the game from the text file.
+        Missing, empty or damaged file counts as no score.
+        '''
+        try:
+            with open(os.path.join(self.directory, game + '.txt'),
+                      'r') as file:
+                return int(file.readline())
+        except (OSError, ValueError):
+            return 0
+
+    def migrateTextScores(self):
+        '''
+        Function saving best scores from the text files as runs
+        of the default player, only when it was not done before.
+        '''
+        with self.connection:
+            applied = self.connection.execute(
+                'SELECT 1 FROM migrations WHERE name = ?',
+                ('best_scores',)).fetchone()
+            if applied is not None:
+                return
+            now = time.time()
+            for game in GAMES:
+                score = self.readScore(game)
+                if score > 0:
+                    self.connection.execute(
+                        'INSERT INTO runs (game, score, ticks, finished, '
+                        'player) VALUES (?, ?, 0, ?, ?)',
+                        (game, score, now, DEFAULT_PLAYER))
+            self.connection.execute(
+                'INSERT INTO migrations (name, applied) VALUES (?, ?)',
+                ('best_scores', now))
+
+    def queryBest(self, game, player=None):
+        '''
+        Function reading best score of the game from the database,
+        of all players or only of the given one.
+        '''
+        if player is None:
+            row = self.connection.execute(
+                'SELECT MAX(score) FROM runs WHERE game = ?',
+                (game,)).fetchone()
+        else:
+            row = self.connection.execute(
+                'SELECT MAX(score) FROM runs WHERE game = ? AND player = ?',
+                (game, player)).fetchone()
+        return row[0] or 0
+
+    def getBest(self, game):
+        '''
+        Function returning best score of the game.
+        '''
+        return self.best_scores.get(game, 0)
+
+    def getPlayerBest(self, game, player=None):
+        '''
+        Function returning best score of the player in the game,
+        by default of the current player.
+        '''
+        self.flush()
+        return self.queryBest(game, player or self.player)
+
+    def getLeaderboard(self, game, size=LEADERBOARD_SIZE):
+        '''
+        Function returning best runs of the game
+        as a list of (player, score, ticks, finished).
+        '''
+        self.flush()
+        return self.connection.execute(
+            'SELECT player, score, ticks, finished FROM runs '
+            'WHERE game = ? ORDER BY score DESC LIMIT ?',
+            (game, size)).fetchall()
+
+    def submit(self, game, score, ticks=0):
+        '''
+        Function saving a finished run of the current player
+        and updating best score of the game if the score is greater.
+        Returns True if the score is a new best score.
+        '''
+        self.queue.put((game, score, ticks, time.time(), self.player))
+        if score <= self.getBest(game):
+            return False
+        self.best_scores[game] = score
+        return True
+
+    def writeBatch(self, connection, runs):
+        '''
+        Function inserting runs in one transaction.
+        '''
+        with connection:
+            connection.executemany(
+                'INSERT INTO runs (game, score, ticks, finished, player) '
+                'VALUES (?, ?, ?, ?, ?)', runs)
+
+    def takeRuns(self, timeout=None):
+        '''
+        Function waiting for runs in the queue and returning
+        all of them, at most BATCH_SIZE. Returns an empty list
+        if nothing came before the timeout.
+        '''
+        try:
+            runs = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(runs) < BATCH_SIZE:
+            try:
+                runs.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return runs
+
+    def reportError(self, error):
+        '''
+        Function remembering that runs could not be written,
+        the first error is reported on the standard error output.
+        '''
+        if self.error is None:
+            print("cannot save runs to %s: %s, retrying"
+                  % (self.path, error), file=sys.stderr)
+        self.error = error
+
+    def writeRuns(self):
+        '''
+        Function executed by the background thread writing runs.
+        Runs waiting in the queue are written together. When writing
+        fails, for example because another process holds the database,
+        the runs are kept and written again later with growing delays.
+        '''
+        connection = connect(self.path)
+        pending = []
+        delay = RETRY_DELAY
+        running = True
+        while running:
+            runs = self.takeRuns(delay if pending else None)
+            if None in runs:
+                running = False
+                runs = [run for run in runs if run is not None]
+            pending += runs
+            if pending:
+                try:
+                    self.writeBatch(connection, pending)
+                    pending = []
+                    delay = RETRY_DELAY
+                except sqlite3.Error as error:
+                    self.reportError(error)
+                    delay = min(delay * 2, MAX_RETRY_DELAY)
+            for i in range(len(runs) + (not running)):
+                self.queue.task_done()
+        for i in range(CLOSE_RETRIES):
+            if not pending:
+                break
+            time.sleep(delay)
+            try:
+                self.writeBatch(connection, pending)
+                pending = []
+            except sqlite3.Error as error:
+                self.reportError(error)
+        if pending:
+            print("%d runs were not saved to %s" % (len(pending), self.path),
+                  file=sys.stderr)
+        connection.close()
+
+    def flush(self):
+        '''
+        Function waiting until every run is written.
+        '''
+        self.queue.join()
+
+    def close(self):
+        '''
+        Function writing remaining runs and stopping the background thread.
+        '''
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.connection.close()
+
+
+def openStore(player=DEFAULT_PLAYER, path=DATABASE):
+    '''
+    Function opening score store shared by the whole app
+    for the given player.
+    '''
+    global _store
+    if _store is None:
+        _store = ScoreStore(path, player)
+    return _store
+
+
+def getStore():
+    '''
+    Function returning score store shared by the whole app.
+    '''
+    return openStore()
+
+
+def closeStore():
+    '''
+    Function closing the shared score store.
+    '''
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show best runs.")
+    parser.add_argument('game', choices=GAMES)
+    parser.add_argument('--top', type=int, default=LEADERBOARD_SIZE)
+    parser.add_argument('--player', default=None,
+                        help="show best score of the player")
+    parser.add_argument('--database', default=DATABASE)
+    args = parser.parse_args()
+
+    store = ScoreStore(args.database)
+    try:
+        if args.player is not None:
+            print(store.getPlayerBest(args.game, args.player))
+            return
+        for player, score, ticks, finished in store.getLeaderboard(
+                args.game, args.top):
+            print('%s,%d,%d,%s' % (player, score, ticks,
+                                   time.strftime('%Y-%m-%d %H:%M:%S',
+                                                 time.localtime(finished))))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,27 @@
 import pygame
 import random
-import os
+import assets
+import fonts
+import scores
+from replay import Recorder
+from controls import AUTOPILOT_KEY
+from autopilot import Autopilot, Plan
+from timestep import interpolate
+from spatial import findRange
+from pool import RingBuffer
+from levels import LevelStream
 
 WHITE = (255, 255, 255)
 LIGHT_BLUE = (100, 100, 230)
 
+GAMEOVER_TIME = 240
+GAMEOVER_HINT = "Press \'R\' to play again or \'ESC\' to go back to menu."
+SCORE_NAME = 'skybird'
+
+SIZE = (800, 600)
+BIRD_SIZE = 50
+OBJECT_WIDTH = 80
+OBJECT_HEIGHT = 20
 GRAVITY = 0.2
 JUMP_VELOCITY = -10
 SPEED_X = 0.3
@@ -12,8 +29,24 @@ MAX_SPEED_X = 6
 OBJ_WALL_DISTANCE = 100
 OBJECTS_DISTANCE = 100
 OBJECTS_SPAWNED = 8
+OBJECTS_CAPACITY = 32
+OBJECT_LIVES = 50
 SCREEN_MOVE_SPEED = 6
 
+LEFT = -1
+NOTHING = 0
+RIGHT = 1
+
+
+def preloadAssets():
+    '''
+    Function loading images and fonts of the game into the caches.
+    '''
+    assets.loadImage('skybird.png', (BIRD_SIZE, BIRD_SIZE))
+    assets.loadImage('object.png', (OBJECT_WIDTH, OBJECT_HEIGHT))
+    fonts.getFont(300)
+    fonts.getFont(30)
+
 
 class Bird:
     '''
@@ -22,9 +55,8 @@ class Bird:
     def __init__(self, size):
         '''
         Function initializing the class.'''
-        self.photo = pygame.image.load(os.path.join('Assets', 'skybird.png'))
         self.rect = pygame.rect.Rect(0, 0, size, size)
-        self.photo = pygame.transform.scale(self.photo, (size, size))
+        self.previous = self.rect.topleft
         self.velocity_y = 0
         self.velocity_x = 0
 
@@ -40,11 +72,19 @@ class Bird:
         '''
         self.velocity_y += GRAVITY
 
-    def draw(self, screen):
+    def drawPosition(self, alpha=1):
+        '''
+        Function returning position of the bird between
+        its previous and current position.
+        '''
+        return (interpolate(self.previous[0], self.rect.x, alpha),
+                interpolate(self.previous[1], self.rect.y, alpha))
+
+    def savePosition(self):
         '''
-        Function drawing a bird.
+        Function saving position of the bird before the next tick.
         '''
-        screen.blit(self.photo, (self.rect.x, self.rect.y))
+        self.previous = self.rect.topleft
 
     def moveleft(self):
         '''
@@ -74,122 +114,167 @@ class Bird:
 class Object:
     '''
     Class defining object in game Skybird.
+    Objects are recycled, so spawn sets every attribute again.
     '''
+    __slots__ = ('width', 'height', 'rect', 'lives', 'number', 'previous_y')
+
     def __init__(self):
         '''
         Function initializing the class.
         '''
-        self.width = 80
-        self.height = 20
-        self.photo = pygame.image.load(os.path.join('Assets', 'object.png'))
-        self.photo = pygame.transform.scale(self.photo,
-                                            (self.width, self.height))
+        self.width = OBJECT_WIDTH
+        self.height = OBJECT_HEIGHT
         self.rect = pygame.rect.Rect((0, 0), (self.width, self.height))
-        self.moved = False
-        self.lives = 50
+        self.lives = OBJECT_LIVES
+
+    def drawPosition(self, alpha=1):
+        '''
+        Function returning position of the object between
+        its previous and current position.'''
+        return (self.rect.x, interpolate(self.previous_y, self.rect.y, alpha))
 
-    def draw(self, screen):
+    def savePosition(self):
+        '''
+        Function saving position of the object before the next tick.
         '''
-        Function drawing onject on the screen.'''
-        if self.lives != 0:
-            screen.blit(self.photo, (self.rect.x, self.rect.y))
+        self.previous_y = self.rect.y
 
-    def spawn(self, score, number, window):
+    def spawn(self, score, number, x, window):
         '''
-        Function spawning object.
+        Function spawning object at the horizontal position x.
         '''
         self.number = number
-        self.rect.x = random.randrange(OBJ_WALL_DISTANCE,
-                                       window.right-OBJ_WALL_DISTANCE -
-                                       self.width)
+        self.lives = OBJECT_LIVES
+        self.rect.x = x
         self.rect.y = (score - number - 1)*OBJECTS_DISTANCE + window.bottom
+        self.savePosition()
 
 
-class SkyBird:
+def objectHeight(obj):
     '''
-    Class defining game Skybird.
+    Function returning height of the object above the top of the window.
+    Objects with higher numbers are higher.
     '''
-    def __init__(self, screen):
-        '''
-        Function initizalizing the class.
-        '''
-        self.screen = screen
-        self.window = self.screen.get_rect()
-        self.bird = Bird(50)
+    return -obj.rect.y
+
+
+def autopilotValue(engine):
+    '''
+    Function rating state for the autopilot by horizontal distance
+    of the bird from the next object above it.
+    '''
+    for obj in engine.live_objects:
+        if obj.number == engine.score + 1:
+            return -abs(obj.rect.centerx - engine.bird.rect.centerx)
+    return 0
+
+
+AUTOPILOT_PLAN = Plan((NOTHING, LEFT, RIGHT), (), autopilotValue, 10, 3)
+
+
+class SkyBirdEngine:
+    '''
+    Class simulating game Skybird.
+    It does not draw anything and does not read the keyboard,
+    so it works without the pygame display.
+    '''
+    def __init__(self, window=None, seed=None):
+        '''
+        Function initizalizing the simulation.
+        The same seed and the same actions always give the same game.
+        '''
+        if window is None:
+            window = pygame.rect.Rect((0, 0), SIZE)
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        self.window = window
+        self.seed = seed
+        self.level = LevelStream(seed, self.objectPosition)
+        self.bird = Bird(BIRD_SIZE)
         self.bird.rect.center = self.window.center
         self.bird.rect.bottom = self.window.bottom
-        self.objects = []
+        self.bird.savePosition()
+        self.objects = RingBuffer(Object, OBJECTS_CAPACITY)
+        self.live_objects = []
         self.score = 0
+        self.ticks = 0
         self.movingscreen = False
         self.spawned_objects = 0
         self.gameover = False
+        self.cause = None
         self.name = "Sky Bird"
         self.spawnObjects()
-        self.downloadBestScore()
-
-    def downloadBestScore(self):
-        '''
-        Function downloading best previous score from the text file.
-        '''
-        file = open(os.path.join('best_scores', 'skybird.txt'), 'r')
-        self.best_score = int(file.readline())
-        file.close()
 
-    def checkBestScore(self):
-        '''
-        Function checking if the current score is
-        greater than previously gained.
-        '''
-        if self.score >= self.best_score:
-            self.best_score = self.score
-            file = open(os.path.join('best_scores', 'skybird.txt'), 'w')
-            file.write(str(self.score))
-            file.close()
+    def getState(self):
+        '''
+        Function returning current state of the simulation.
+        Objects are given as (number, x, y, lives).
+        '''
+        return {
+            'ticks': self.ticks,
+            'score': self.score,
+            'gameover': self.gameover,
+            'bird_x': self.bird.rect.x,
+            'bird_y': self.bird.rect.y,
+            'velocity_x': self.bird.velocity_x,
+            'velocity_y': self.bird.velocity_y,
+            'objects': [(obj.number, obj.rect.x, obj.rect.y, obj.lives)
+                        for obj in self.objects],
+        }
 
-    def drawGame(self):
-        '''
-        Function drawing the game.
-        '''
-        self.drawScore()
-        self.bird.draw(self.screen)
-        for obj in self.objects:
-            obj.draw(self.screen)
+    def getSnapshot(self):
+        '''
+        Function returning simulation state as a flat tuple of numbers,
+        which can be restored by setSnapshot.
+        '''
+        return (self.ticks, self.score, self.movingscreen,
+                self.spawned_objects, self.gameover, self.cause,
+                self.bird.rect.x, self.bird.rect.y, self.bird.previous[0],
+                self.bird.previous[1], self.bird.velocity_x,
+                self.bird.velocity_y,
+                tuple((obj.number, obj.rect.x, obj.rect.y, obj.previous_y,
+                       obj.lives) for obj in self.objects),
+                self.seed)
 
-    def drawFinalResult(self):
-        '''
-        Function drawing final result.'''
-        self.drawScore()
+    def setSnapshot(self, snapshot):
+        '''
+        Function restoring simulation state saved by getSnapshot.
+        '''
+        (self.ticks, self.score, self.movingscreen, self.spawned_objects,
+         self.gameover, self.cause, x, y, previous_x, previous_y,
+         self.bird.velocity_x, self.bird.velocity_y, objects,
+         seed) = snapshot
+        self.bird.rect.topleft = (x, y)
+        self.bird.previous = (previous_x, previous_y)
+        self.objects.clear()
+        del self.live_objects[:]
+        for number, x, y, previous_y, lives in objects:
+            obj = self.objects.push()
+            obj.number = number
+            obj.rect.topleft = (x, y)
+            obj.previous_y = previous_y
+            obj.lives = lives
+            if obj.lives != 0:
+                self.live_objects.append(obj)
+        if seed != self.seed:
+            self.seed = seed
+            self.level = LevelStream(seed, self.objectPosition)
 
-    def drawWindow(self):
+    def objectPosition(self, rng):
         '''
-        Function drawing window.
+        Function generating horizontal position of an object.
         '''
-        self.screen.fill(LIGHT_BLUE)
-        if not self.gameover:
-            self.drawGame()
-        else:
-            self.drawFinalResult()
-
-    def drawScore(self):
-        '''
-        Function drawing score.
-        '''
-        self.scorefont = pygame.font.SysFont('comicsans', 300)
-        self.score_text = self.scorefont.render(str(self.score), 1, WHITE)
-        self.score_box = self.score_text.get_rect()
-        self.score_box.center = self.window.center
-        self.screen.blit(self.score_text, (self.score_box.x, self.score_box.y))
+        return rng.randrange(OBJ_WALL_DISTANCE,
+                             self.window.right - OBJ_WALL_DISTANCE -
+                             OBJECT_WIDTH)
 
-    def handleBird(self):
+    def handleBird(self, action):
         '''
         Function controlling movement of the bird in Skybird game.
         '''
-        self.keys_pressed = pygame.key.get_pressed()
-        if self.keys_pressed[pygame.K_a] and self.keys_pressed[pygame.K_d]:
-            pass
-        elif self.keys_pressed[pygame.K_a]:
+        if action == LEFT:
             self.bird.moveleft()
-        elif self.keys_pressed[pygame.K_d]:
+        elif action == RIGHT:
             self.bird.moveright()
 
     def moveBird(self):
@@ -202,37 +287,61 @@ class SkyBird:
             if self.score == 0:
                 self.bird.jump()
             else:
-                self.gameOver()
+                self.gameOver('fall')
         if self.bird.rect.left >= self.window.right:
             self.bird.rect.left = self.window.left
+            self.bird.savePosition()
         if self.bird.rect.right <= self.window.left:
             self.bird.rect.right = self.window.right
+            self.bird.savePosition()
 
     def spawnObjects(self):
         '''
         Function spawning objects.
         '''
         for i in range(self.spawned_objects, self.score + OBJECTS_SPAWNED):
-            object = Object()
+            object = self.objects.push()
+            object.spawn(self.score, i, self.level.get(i), self.window)
             if i >= 100:
                 object.lives = 1
-            object.spawn(self.score, i, self.window)
-            self.objects.append(object)
+            self.live_objects.append(object)
         self.spawned_objects = self.score + OBJECTS_SPAWNED
 
+    def savePositions(self):
+        '''
+        Function saving positions of the bird and objects,
+        so they can be drawn between two ticks.
+        '''
+        self.bird.savePosition()
+        for obj in self.objects:
+            obj.savePosition()
+
     def objectsCollisions(self):
         '''
         Function controlling collisions of objects and bird.
+        Only objects with lives left are kept sorted by height,
+        so only the ones at the height of the bird are checked.
         '''
         if self.bird.velocity_y > 0:
-            for obj in self.objects:
-                if obj.rect.colliderect(self.bird.rect) and obj.lives != 0:
+            start, end = findRange(self.live_objects,
+                                   -self.bird.rect.bottom,
+                                   OBJECT_HEIGHT - self.bird.rect.top,
+                                   objectHeight)
+            i = start
+            while i < end:
+                obj = self.live_objects[i]
+                i += 1
+                if obj.rect.colliderect(self.bird.rect):
                     if (self.bird.rect.bottom - 10) < obj.rect.y:
                         if self.score != obj.number:
                             self.spawnObjects()
                             self.movingscreen = True
                             self.score = obj.number
                         obj.lives -= 1
+                        if obj.lives == 0:
+                            i -= 1
+                            end -= 1
+                            del self.live_objects[i]
                         self.bird.jump()
 
     def moveScreen(self):
@@ -252,22 +361,164 @@ class SkyBird:
         Function removing unnecessary objects.
         '''
         if self.objects[0].rect.y > self.window.bottom:
-            self.objects[:] = self.objects[1:]
+            if self.live_objects and self.live_objects[0] is self.objects[0]:
+                del self.live_objects[0]
+            self.objects.popleft()
 
-    def gameOver(self):
+    def gameOver(self, cause):
         '''
-        Function executing game over.
+        Function executing game over
+        and remembering what the bird hit first.
         '''
-        self.checkBestScore()
+        if not self.gameover:
+            self.cause = cause
         self.gameover = True
-        pygame.time.delay(2000)
 
-    def actions(self):
+    def step(self, action=NOTHING):
         '''
-        Function proceeding every steady process in the game.
+        Function simulating one tick of the game with the given action.
         '''
+        if self.gameover:
+            return
+        self.savePositions()
         self.objectsCollisions()
         self.removeObjects()
-        self.handleBird()
+        self.handleBird(action)
         self.moveBird()
         self.moveScreen()
+        self.ticks += 1
+
+
+class SkyBird(SkyBirdEngine):
+    '''
+    Class defining game Skybird.
+    '''
+    def __init__(self, screen, seed=None):
+        '''
+        Function initizalizing the class.
+        '''
+        self.screen = screen
+        SkyBirdEngine.__init__(self, self.screen.get_rect(), seed)
+        self.recorder = Recorder(SCORE_NAME, self.seed)
+        self.bird_photo = assets.loadImage('skybird.png',
+                                           (BIRD_SIZE, BIRD_SIZE))
+        self.object_photo = assets.loadImage('object.png',
+                                             (OBJECT_WIDTH, OBJECT_HEIGHT))
+        self.gameover_time = 0
+        self.finished = False
+        self.restart = False
+        self.autopilot = Autopilot(SkyBirdEngine, AUTOPILOT_PLAN, self.window)
+        self.downloadBestScore()
+
+    def downloadBestScore(self):
+        '''
+        Function downloading best previous score from the score store.
+        '''
+        self.best_score = scores.getStore().getBest(SCORE_NAME)
+
+    def checkBestScore(self):
+        '''
+        Function checking if the current score is
+        greater than previously gained.
+        Games played with the autopilot are not saved.
+        '''
+        if self.autopilot.used:
+            return
+        if scores.getStore().submit(SCORE_NAME, self.score, self.ticks):
+            self.best_score = self.score
+
+    def drawGame(self, alpha=1):
+        '''
+        Function drawing the game.
+        '''
+        self.drawScore()
+        self.screen.blit(self.bird_photo, self.bird.drawPosition(alpha))
+        self.screen.blits([(self.object_photo, obj.drawPosition(alpha))
+                           for obj in self.live_objects])
+
+    def drawFinalResult(self):
+        '''
+        Function drawing final result.'''
+        self.drawScore()
+        self.drawGameOverHint()
+
+    def drawGameOverHint(self):
+        '''
+        Function drawing hint on the game over screen.
+        '''
+        self.hint_text = fonts.renderText(GAMEOVER_HINT, 30, WHITE)
+        self.hint_box = self.hint_text.get_rect()
+        self.hint_box.centerx = self.window.centerx
+        self.hint_box.bottom = self.window.bottom - 20
+        self.screen.blit(self.hint_text, (self.hint_box.x, self.hint_box.y))
+
+    def drawWindow(self, alpha=1):
+        '''
+        Function drawing window.
+        '''
+        self.screen.fill(LIGHT_BLUE)
+        if not self.gameover:
+            self.drawGame(alpha)
+        else:
+            self.drawFinalResult()
+
+    def drawScore(self):
+        '''
+        Function drawing score.
+        '''
+        self.score_text = fonts.renderText(str(self.score), 300, WHITE)
+        self.score_box = self.score_text.get_rect()
+        self.score_box.center = self.window.center
+        self.screen.blit(self.score_text, (self.score_box.x, self.score_box.y))
+
+    def readAction(self, inputs):
+        '''
+        Function reading action of the player from the input of the tick.
+        '''
+        if self.autopilot.enabled:
+            return self.autopilot.nextAction(self)
+        left = inputs.isHeld(pygame.K_a)
+        right = inputs.isHeld(pygame.K_d)
+        if left and right:
+            return NOTHING
+        elif left:
+            return LEFT
+        elif right:
+            return RIGHT
+        return NOTHING
+
+    def startGameOver(self):
+        '''
+        Function starting the game over screen.
+        '''
+        self.checkBestScore()
+        self.recorder.save(self.score, self.ticks)
+        self.gameover_time = GAMEOVER_TIME
+
+    def countGameOver(self, inputs):
+        '''
+        Function counting down the game over screen.
+        The player can skip it or restart the game immediately.
+        '''
+        if inputs.wasPressed(pygame.K_r):
+            self.restart = True
+        elif inputs.wasPressed(pygame.K_ESCAPE, pygame.K_RETURN):
+            self.finished = True
+        self.gameover_time -= 1
+        if self.gameover_time <= 0:
+            self.finished = True
+
+    def actions(self, inputs):
+        '''
+        Function proceeding every steady process in the game.
+        '''
+        if not self.gameover:
+            if inputs.wasPressed(AUTOPILOT_KEY):
+                self.autopilot.toggle()
+            action = self.readAction(inputs)
+            self.recorder.record(action, self)
+            self.step(action)
+            if self.gameover:
+                self.startGameOver()
+        else:
+            self.countGameOver(inputs)
@@ -0,0 +1,11 @@
+import bisect
+
+
+def findRange(items, low, high, key):
+    '''
+    Function returning indices (start, end) of items with
+    low < key(item) < high. Items have to be sorted by key.
+    '''
+    start = bisect.bisect_right(items, low, key=key)
+    end = bisect.bisect_left(items, high, lo=start, key=key)
+    return start, end
@@ -1,11 +1,23 @@
 import pygame
 import random
-import os
+import assets
+import fonts
+import scores
+from replay import Recorder
+from controls import AUTOPILOT_KEY
+from autopilot import Autopilot, Plan
+from timestep import interpolate
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 LIGHT_BLUE = (100, 100, 230)
 
+GAMEOVER_TIME = 240
+GAMEOVER_HINT = "Press \'R\' to play again or \'ESC\' to go back to menu."
+SCORE_NAME = 'spikes'
+
+SIZE = (800, 600)
+BIRD_SIZE = 30
 PADDING = 60
 SPIKE_WIDTH = 5
 SPIKE_HEIGHT = 60
@@ -14,14 +26,26 @@ SPIKES_NUMBER = 8
 JUMP_VELOCITY = -3
 GRAVITY = 0.1
 
+NOTHING = 0
+JUMP = 1
+
+
+def preloadAssets():
+    '''
+    Function loading images and fonts of the game into the caches.
+    '''
+    assets.loadImage('skybird.png', (BIRD_SIZE, BIRD_SIZE))
+    fonts.getFont(300)
+    fonts.getFont(30)
+
+
 class Bird:
     '''
     Class defining bird in game Spikes.
     '''
     def __init__(self, size):
-        self.photo = pygame.image.load(os.path.join('Assets', 'skybird.png'))
         self.rect = pygame.rect.Rect(0, 0, size, size)
-        self.photo = pygame.transform.scale(self.photo, (size, size))
+        self.previous = self.rect.topleft
         self.velocity_y = 0
         self.velocity_x = 3
         self.direction = 1
@@ -39,11 +63,19 @@ class Bird:
         self.velocity_y += GRAVITY
         self.rect.y += self.velocity_y
 
-    def draw(self, screen):
+    def drawPosition(self, alpha=1):
         '''
-        Function drawing bird.
+        Function returning position of the bird between
+        its previous and current position.
         '''
-        screen.blit(self.photo, (self.rect.x, self.rect.y))
+        return (interpolate(self.previous[0], self.rect.x, alpha),
+                interpolate(self.previous[1], self.rect.y, alpha))
+
+    def savePosition(self):
+        '''
+        Function saving position of the bird before the next tick.
+        '''
+        self.previous = self.rect.topleft
 
     def move(self):
         '''
@@ -63,123 +95,145 @@ class Spike:
     '''
         Class defining a spike.
     '''
-    def __init__(self, side, y):
+    def __init__(self, side, y, window):
         '''
         Function initializing the class.
         '''
+        self.side = side
+        self.slot = y
         if side == "LEFT":
             self.rect = pygame.rect.Rect(PADDING, PADDING+y*SPIKE_HEIGHT,
                                          SPIKE_WIDTH, SPIKE_HEIGHT)
         else:
-            self.rect = pygame.rect.Rect(800-(PADDING+SPIKE_WIDTH),
+            self.rect = pygame.rect.Rect(window.right-(PADDING+SPIKE_WIDTH),
                                          PADDING+y*SPIKE_HEIGHT,
                                          SPIKE_WIDTH,
                                          SPIKE_HEIGHT)
 
-    def drawRect(self, screen):
-        '''
-        Function drawing rectangle of spike.
-        '''
-        pygame.draw.rect(screen, BLACK, self.rect)
 
+def autopilotValue(engine):
+    '''
+    Function rating state for the autopilot by distance of the bird
+    from the nearest place without a spike on the wall it flies to.
+    '''
+    taken = set(spike.slot for spike in engine.spikes)
+    center = engine.bird.rect.centery
+    distance = engine.window.height
+    for slot in range(SPIKES_NUMBER):
+        if slot not in taken:
+            y = PADDING + slot * SPIKE_HEIGHT + SPIKE_HEIGHT / 2
+            distance = min(distance, abs(center - y))
+    return -distance
 
-class SpikesBird:
+
+AUTOPILOT_PLAN = Plan((NOTHING, JUMP), (JUMP,), autopilotValue, 8, 4)
+
+
+class SpikesBirdEngine:
     '''
-    Class defining the game of Spikes.
+    Class simulating the game of Spikes.
+    It does not draw anything and does not read the keyboard,
+    so it works without the pygame display.
     '''
-    def __init__(self, screen):
-        '''
-        Function initializing the game.
-        '''
-        self.screen = screen
-        self.window = self.screen.get_rect()
+    def __init__(self, window=None, seed=None):
+        '''
+        Function initializing the simulation.
+        The same seed and the same actions always give the same game.
+        '''
+        if window is None:
+            window = pygame.rect.Rect((0, 0), SIZE)
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        self.window = window
+        self.seed = seed
+        self.random = random.Random(seed)
         self.gamewindow = pygame.rect.Rect(PADDING,
                                            PADDING,
                                            self.window.width-PADDING*2,
                                            self.window.height-PADDING*2)
-        self.bird = Bird(30)
+        self.bird = Bird(BIRD_SIZE)
         self.bird.rect.center = self.window.center
+        self.bird.savePosition()
         self.score = 0
+        self.ticks = 0
         self.spikes_number = 1
         self.gameover = False
+        self.cause = None
         self.spawnSpikes()
-        self.downloadBestScore()
-
-    def downloadBestScore(self):
-        '''
-        Function downloading best score from the text file.
-        '''
-        file = open(os.path.join('best_scores', 'spikes.txt'), 'r')
-        self.best_score = int(file.readline())
-        file.close()
 
-    def checkBestScore(self):
-        '''
-        Function checking if the score is greater than the previous best score.
-        '''
-        if self.score >= self.best_score:
-            self.best_score = self.score
-            file = open(os.path.join('best_scores', 'spikes.txt'), 'w')
-            file.write(str(self.score))
-            file.close()
+    def getState(self):
+        '''
+        Function returning current state of the simulation.
+        Spikes are given as their rectangles (x, y, width, height).
+        '''
+        return {
+            'ticks': self.ticks,
+            'score': self.score,
+            'gameover': self.gameover,
+            'bird_x': self.bird.rect.x,
+            'bird_y': self.bird.rect.y,
+            'velocity_x': self.bird.velocity_x * self.bird.direction,
+            'velocity_y': self.bird.velocity_y,
+            'spikes': [tuple(spike.rect) for spike in self.spikes],
+        }
 
-    def drawWindow(self):
-        '''
-        Function drawing window.
-        '''
-        self.screen.fill(BLACK)
-        pygame.draw.rect(self.screen, LIGHT_BLUE, self.gamewindow)
-        self.drawScore()
-        if not self.gameover:
-            self.drawSpikes()
-            self.bird.draw(self.screen)
+    def getSnapshot(self):
+        '''
+        Function returning simulation state as a flat tuple of numbers,
+        which can be restored by setSnapshot.
+        '''
+        return (self.ticks, self.score, self.spikes_number, self.gameover,
+                self.cause, self.bird.rect.x, self.bird.rect.y,
+                self.bird.previous[0], self.bird.previous[1],
+                self.bird.velocity_x, self.bird.velocity_y,
+                self.bird.direction,
+                tuple((spike.side, spike.slot) for spike in self.spikes),
+                self.random.getstate())
 
-    def drawScore(self):
-        '''
-        Function drawing score.
-        '''
-        self.scorefont = pygame.font.SysFont('comicsans', 300)
-        self.score_text = self.scorefont.render(str(self.score), 1, WHITE)
-        self.score_box = self.score_text.get_rect()
-        self.score_box.center = self.window.center
-        self.screen.blit(self.score_text, (self.score_box.x, self.score_box.y))
+    def setSnapshot(self, snapshot):
+        '''
+        Function restoring simulation state saved by getSnapshot.
+        '''
+        (self.ticks, self.score, self.spikes_number, self.gameover,
+         self.cause, x, y, previous_x, previous_y, self.bird.velocity_x,
+         self.bird.velocity_y, self.bird.direction, spikes,
+         random_state) = snapshot
+        self.bird.rect.topleft = (x, y)
+        self.bird.previous = (previous_x, previous_y)
+        self.spikes = [Spike(side, slot, self.window)
+                       for side, slot in spikes]
+        version, internal, gauss = random_state
+        self.random.setstate((version, tuple(internal), gauss))
 
     def spawnSpikes(self):
         '''
         Function spawning spikes.
         '''
         self.spikes = []
-        spikes = random.sample(range(SPIKES_NUMBER), self.spikes_number)
+        spikes = self.random.sample(range(SPIKES_NUMBER), self.spikes_number)
         for i in range(self.spikes_number):
             if self.bird.direction == -1:
-                self.spikes.append(Spike("LEFT", spikes[i]))
+                self.spikes.append(Spike("LEFT", spikes[i], self.window))
             else:
-                self.spikes.append(Spike("RIGHT", spikes[i]))
+                self.spikes.append(Spike("RIGHT", spikes[i], self.window))
 
-    def handleBird(self):
+    def handleBird(self, action):
         '''
         Function handling controlling of the bird.
         '''
-        self.keys_pressed = pygame.key.get_pressed()
-        if self.keys_pressed[pygame.K_SPACE] or self.keys_pressed[pygame.K_w]:
+        if action == JUMP:
             self.bird.jump()
         self.bird.gravity()
         self.bird.move()
 
-    def drawSpikes(self):
-        '''
-        Function drawing spikes.
-        '''
-        for spike in self.spikes:
-            spike.drawRect(self.screen)
-
-    def gameOver(self):
+    def gameOver(self, cause):
         '''
-        Function executing GameOver process.
+        Function executing GameOver process
+        and remembering what the bird hit first.
         '''
-        self.checkBestScore()
+        if not self.gameover:
+            self.cause = cause
         self.gameover = True
-        pygame.time.delay(2000)
 
     def checkCollisions(self):
         '''
@@ -194,18 +248,169 @@ class SpikesBird:
             self.spawnSpikes()
             self.score += 1
         if self.bird.rect.bottom >= self.gamewindow.bottom:
-            self.gameOver()
+            self.gameOver('floor')
         if self.bird.rect.top <= self.window.top:
-            self.gameOver()
+            self.gameOver('ceiling')
         for spike in self.spikes:
             if self.bird.rect.colliderect(spike.rect):
-                self.gameOver()
+                self.gameOver('spike')
         self.spikes_number = int((self.score-1)/5)+1
 
-    def actions(self):
+    def step(self, action=NOTHING):
+        '''
+        Function simulating one tick of the game with the given action.
+        '''
+        if self.gameover:
+            return
+        self.bird.savePosition()
+        self.checkCollisions()
+        self.handleBird(action)
+        self.ticks += 1
+
+
+class SpikesBird(SpikesBirdEngine):
+    '''
+    Class defining the game of Spikes.
+    '''
+    def __init__(self, screen, seed=None):
+        '''
+        Function initializing the game.
+        '''
+        self.screen = screen
+        SpikesBirdEngine.__init__(self, self.screen.get_rect(), seed)
+        self.recorder = Recorder(SCORE_NAME, self.seed)
+        self.bird_photo = assets.loadImage('skybird.png',
+                                           (BIRD_SIZE, BIRD_SIZE))
+        self.gameover_time = 0
+        self.finished = False
+        self.restart = False
+        self.autopilot = Autopilot(SpikesBirdEngine, AUTOPILOT_PLAN, self.window)
+        self.downloadBestScore()
+        self.createArena()
+
+    def downloadBestScore(self):
+        '''
+        Function downloading best score from the score store.
+        '''
+        self.best_score = scores.getStore().getBest(SCORE_NAME)
+
+    def checkBestScore(self):
+        '''
+        Function checking if the score is greater than the previous best score.
+        Games played with the autopilot are not saved.
+        '''
+        if self.autopilot.used:
+            return
+        if scores.getStore().submit(SCORE_NAME, self.score, self.ticks):
+            self.best_score = self.score
+
+    def createArena(self):
+        '''
+        Function creating layer with the frame, the arena and the spikes.
+        '''
+        self.arena = pygame.Surface(self.window.size)
+        self.spike_photo = pygame.Surface((SPIKE_WIDTH, SPIKE_HEIGHT))
+        self.spike_photo.fill(BLACK)
+        self.arena_spikes = None
+        self.arena_rects = []
+        self.drawArena()
+
+    def drawArena(self):
+        '''
+        Function drawing the frame, the arena and the spikes on the layer.
+        The layer is drawn again only when the spikes change,
+        after game over it is shown without spikes.
+        '''
+        spikes = []
+        if not self.gameover:
+            spikes = self.spikes
+        key = tuple((spike.side, spike.slot) for spike in spikes)
+        if key == self.arena_spikes:
+            return
+        self.arena.fill(BLACK)
+        pygame.draw.rect(self.arena, LIGHT_BLUE, self.gamewindow)
+        self.arena.blits([(self.spike_photo, spike.rect) for spike in spikes],
+                         False)
+        rects = [spike.rect.copy() for spike in spikes]
+        for rect in self.arena_rects + rects:
+            self.screen.invalidate(rect)
+        self.arena_spikes = key
+        self.arena_rects = rects
+
+    def drawWindow(self, alpha=1):
+        '''
+        Function drawing window.
+        '''
+        self.drawArena()
+        self.screen.blit(self.arena, (0, 0))
+        self.drawScore()
+        if not self.gameover:
+            self.screen.blit(self.bird_photo, self.bird.drawPosition(alpha))
+        else:
+            self.drawGameOverHint()
+
+    def drawGameOverHint(self):
+        '''
+        Function drawing hint on the game over screen.
+        '''
+        self.hint_text = fonts.renderText(GAMEOVER_HINT, 30, WHITE)
+        self.hint_box = self.hint_text.get_rect()
+        self.hint_box.centerx = self.window.centerx
+        self.hint_box.bottom = self.window.bottom - 20
+        self.screen.blit(self.hint_text, (self.hint_box.x, self.hint_box.y))
+
+    def drawScore(self):
+        '''
+        Function drawing score.
+        '''
+        self.score_text = fonts.renderText(str(self.score), 300, WHITE)
+        self.score_box = self.score_text.get_rect()
+        self.score_box.center = self.window.center
+        self.screen.blit(self.score_text, (self.score_box.x, self.score_box.y))
+
+    def readAction(self, inputs):
+        '''
+        Function reading action of the player from the input of the tick.
+        The bird jumps only when the key is pressed, holding it does nothing.
+        '''
+        if self.autopilot.enabled:
+            return self.autopilot.nextAction(self)
+        if inputs.wasPressed(pygame.K_SPACE, pygame.K_w):
+            return JUMP
+        return NOTHING
+
+    def startGameOver(self):
+        '''
+        Function starting the game over screen.
+        '''
+        self.checkBestScore()
+        self.recorder.save(self.score, self.ticks)
+        self.gameover_time = GAMEOVER_TIME
+
+    def countGameOver(self, inputs):
+        '''
+        Function counting down the game over screen.
+        The player can skip it or restart the game immediately.
+        '''
+        if inputs.wasPressed(pygame.K_r):
+            self.restart = True
+        elif inputs.wasPressed(pygame.K_ESCAPE, pygame.K_RETURN):
+            self.finished = True
+        self.gameover_time -= 1
+        if self.gameover_time <= 0:
+            self.finished = True
+
+    def actions(self, inputs):
         '''
         Function executing all steadly working actions.
         '''
         if not self.gameover:
-            self.checkCollisions()
-            self.handleBird()
+            if inputs.wasPressed(AUTOPILOT_KEY):
+                self.autopilot.toggle()
+            action = self.readAction(inputs)
+            self.recorder.record(action, self)
+            self.step(action)
+            if self.gameover:
+                self.startGameOver()
+        else:
+            self.countGameOver(inputs)
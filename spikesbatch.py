@@ -0,0 +1,144 @@
+import numpy as np
+from flappybatch import roundPosition
+from spikes import (SIZE, BIRD_SIZE, PADDING, SPIKE_WIDTH, SPIKE_HEIGHT,
+                    SPIKES_NUMBER, JUMP_VELOCITY, GRAVITY)
+
+SPEED_X = 3
+SPEED_X_INCREASE = 0.05
+SPIKES_SCORE_STEP = 5
+
+
+class SpikesBirdBatch:
+    '''
+    Class simulating many independent games of Spikes at once
+    with NumPy arrays. Every game keeps its bird in array rows and
+    its spikes as a row of a boolean matrix with one column per slot.
+    Rules follow SpikesBirdEngine, constants of the arena can be changed
+    to compare different settings.
+    '''
+    def __init__(self, number, seed=None, size=SIZE, padding=PADDING,
+                 spike_width=SPIKE_WIDTH, spike_height=SPIKE_HEIGHT,
+                 slots=SPIKES_NUMBER, score_step=SPIKES_SCORE_STEP):
+        '''
+        Function initializing the given number of games.
+        '''
+        self.number = number
+        self.width, self.height = size
+        self.padding = padding
+        self.spike_width = spike_width
+        self.spike_height = spike_height
+        self.slots = slots
+        self.score_step = score_step
+        self.random = np.random.default_rng(seed)
+        self.x = np.full(number, self.width // 2 - BIRD_SIZE // 2,
+                         dtype=np.float64)
+        self.y = np.full(number, self.height // 2 - BIRD_SIZE // 2,
+                         dtype=np.float64)
+        self.velocity_x = np.full(number, SPEED_X, dtype=np.float64)
+        self.velocity_y = np.zeros(number, dtype=np.float64)
+        self.direction = np.ones(number, dtype=np.int64)
+        self.alive = np.ones(number, dtype=bool)
+        self.score = np.zeros(number, dtype=np.int64)
+        self.ticks = np.zeros(number, dtype=np.int64)
+        self.spikes_number = np.ones(number, dtype=np.int64)
+        self.spikes = np.zeros((number, slots), dtype=bool)
+        self.spikes_y = padding + np.arange(slots) * spike_height
+        self.steps = 0
+        self.spawnSpikes(np.ones(number, dtype=bool))
+
+    def spawnSpikes(self, games):
+        '''
+        Function drawing new spikes in the chosen games.
+        Every game gets spikes_number different slots.
+        '''
+        games = np.nonzero(games)[0]
+        keys = self.random.random((len(games), self.slots))
+        ranks = keys.argsort(axis=1).argsort(axis=1)
+        self.spikes[games] = ranks < self.spikes_number[games, None]
+
+    def checkWalls(self, alive):
+        '''
+        Function bouncing birds which reached a wall.
+        Returns mask of games which gained a point.
+        '''
+        right = self.width - self.padding
+        hit = alive & ((self.x + BIRD_SIZE >= right) |
+                       (self.x <= self.padding))
+        self.direction = np.where(hit, -self.direction, self.direction)
+        self.velocity_x = np.where(hit, self.velocity_x + SPEED_X_INCREASE,
+                                   self.velocity_x)
+        if hit.any():
+            self.spawnSpikes(hit)
+        self.score += hit
+        return hit
+
+    def findCollisions(self):
+        '''
+        Function returning mask of birds hitting spikes, floor or ceiling.
+        '''
+        top = self.y
+        bottom = self.y + BIRD_SIZE
+        dead = (bottom >= self.height - self.padding) | (top <= 0)
+        spike_x = np.where(self.direction == -1, self.padding,
+                           self.width - (self.padding + self.spike_width))
+        near = np.nonzero((self.x < spike_x + self.spike_width) &
+                          (spike_x < self.x + BIRD_SIZE))[0]
+        if len(near) > 0:
+            overlap = ((top[near, None] < self.spikes_y + self.spike_height) &
+                       (self.spikes_y < bottom[near, None]))
+            dead[near] |= (overlap & self.spikes[near]).any(axis=1)
+        return dead
+
+    def moveBirds(self, jump, alive):
+        '''
+        Function applying jumps, gravity and horizontal move to living birds.
+        '''
+        velocity = np.where(jump, JUMP_VELOCITY, self.velocity_y) + GRAVITY
+        self.velocity_y = np.where(alive, velocity, self.velocity_y)
+        self.y = np.where(alive, roundPosition(self.y + self.velocity_y),
+                          self.y)
+        self.x = np.where(alive, roundPosition(self.x + self.velocity_x *
+                                               self.direction), self.x)
+
+    def step(self, jump=False):
+        '''
+        Function simulating one tick of every game.
+        jump can be one value for all games or an array with value per game.
+        Returns number of games which are still running.
+        '''
+        alive = self.alive.copy()
+        jump = np.broadcast_to(np.asarray(jump, dtype=bool), alive.shape)
+        self.checkWalls(alive)
+        dead = self.findCollisions() & alive
+        self.spikes_number = np.where(
+            alive, np.trunc((self.score - 1) / self.score_step).astype(
+                np.int64) + 1, self.spikes_number)
+        self.moveBirds(jump, alive)
+        self.ticks += alive
+        self.alive &= ~dead
+        self.steps += 1
+        return int(self.alive.sum())
+
+    def getState(self):
+        '''
+        Function returning current state of all games as arrays.
+        '''
+        return {
+            'x': self.x,
+            'y': self.y,
+            'velocity_x': self.velocity_x * self.direction,
+            'velocity_y': self.velocity_y,
+            'alive': self.alive,
+            'score': self.score,
+            'ticks': self.ticks,
+            'spikes': self.spikes,
+        }
+
+    def run(self, policy, max_ticks):
+        '''
+        Function running the games until all of them end or max_ticks pass.
+        policy is called every tick with the simulation and returns jumps.
+        '''
+        while self.alive.any() and self.steps < max_ticks:
+            self.step(policy(self))
+        return self.score
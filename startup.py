@@ -0,0 +1,61 @@
+import json
+import time
+
+PROCESS_START = time.perf_counter()
+STARTUP_FILE = 'startup.json'
+
+
+class StartupTimer:
+    '''
+    Class measuring how long it takes to show the first frame of the app
+    and the first frame of every game started from the menu.
+    Times are in milliseconds, measured from the import of this module.
+    '''
+    def __init__(self, start=PROCESS_START):
+        '''
+        Function initializing the timer.
+        '''
+        self.start = start
+        self.first_frame = None
+        self.first_game_frame = None
+        self.game_starts = {}
+
+    def elapsed(self, since):
+        '''
+        Function returning milliseconds which passed since the given time.
+        '''
+        return round((time.perf_counter() - since) * 1000, 1)
+
+    def frameShown(self, manager):
+        '''
+        Function noting that a frame has been presented.
+        If a game was requested in the menu, time from the request
+        to its first frame is saved.
+        '''
+        if self.first_frame is None:
+            self.first_frame = self.elapsed(self.start)
+        if manager.game_requested is not None and manager.game is not None:
+            latency = self.elapsed(manager.game_requested)
+            manager.game_requested = None
+            if self.first_game_frame is None:
+                self.first_game_frame = self.elapsed(self.start)
+            name = type(manager.game).__name__
+            starts = self.game_starts.setdefault(
+                name, {'count': 0, 'first_ms': latency, 'max_ms': latency})
+            starts['count'] += 1
+            starts['max_ms'] = max(starts['max_ms'], latency)
+
+    def report(self):
+        '''
+        Function returning the measured times as a dictionary.
+        '''
+        return {'first_frame_ms': self.first_frame,
+                'first_game_frame_ms': self.first_game_frame,
+                'game_starts': self.game_starts}
+
+    def writeReport(self, path=STARTUP_FILE):
+        '''
+        Function writing the measured times to the JSON file.
+        '''
+        with open(path, 'w') as file:
+            json.dump(self.report(), file, indent=2)
@@ -0,0 +1,45 @@
+TICK_RATE = 120
+MAX_TICKS_PER_FRAME = 8
+
+
+class FixedTimestep:
+    '''
+    Class dividing real time into simulation ticks of fixed length.
+    '''
+    def __init__(self, tick_rate=TICK_RATE,
+                 max_ticks=MAX_TICKS_PER_FRAME):
+        '''
+        Function initializing the class.
+        '''
+        self.tick_time = 1000 / tick_rate
+        self.max_ticks = max_ticks
+        self.accumulator = 0
+
+    def advance(self, elapsed):
+        '''
+        Function adding elapsed real time in milliseconds and returning
+        the number of ticks which should be simulated now.
+        When the simulation is too far behind, the remaining time
+        is dropped instead of running more ticks.
+        '''
+        self.accumulator += elapsed
+        ticks = int(self.accumulator // self.tick_time)
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+            self.accumulator = self.tick_time * ticks
+        self.accumulator -= self.tick_time * ticks
+        return ticks
+
+    def alpha(self):
+        '''
+        Function returning how far the current frame is between
+        the previous and the next tick (from 0 to 1).
+        '''
+        return self.accumulator / self.tick_time
+
+
+def interpolate(previous, current, alpha):
+    '''
+    Function returning position between previous and current one.
+    '''
+    return round(previous + (current - previous) * alpha)